@@ -0,0 +1,173 @@
+"""
+batch_validate.py
+
+This file checks many 9x9 boards at once with NumPy. Boards are passed as an
+(N, 9, 9) uint8 array; every row, column and box of every board is checked in a
+few vectorized operations, and solutions can be checked against the givens of
+their puzzles. No Python object is created per board.
+
+Each digit is turned into its bit (digit 1 is bit 0) through a lookup table, and
+the bits of a unit are OR-ed together. Nine cells can only cover all nine bits if
+they hold each digit once, and any value outside 1-9 maps to no bit, so a unit is
+valid exactly when its OR is 0x1FF. Boards are processed in blocks so that the
+temporary arrays stay small however many boards there are.
+
+Puzzle bank records are decoded straight from the memory-mapped file into arrays.
+
+Usage:
+    python batch_validate.py BANK [--block-size 65536]
+
+Functions:
+- validate_boards(boards, puzzles, block_size): Checks the rules, and the givens, of a batch of boards.
+- decode_records(records): Decodes puzzle bank records into puzzle and solution arrays.
+- validate_bank(bank, block_size): Checks every record of a puzzle bank.
+- main(argv): Parses the arguments and checks a puzzle bank.
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+from puzzle_bank import GIVENS_BYTES, RECORD_SIZE, SOLUTION_BYTES, PuzzleBank
+
+ALL_DIGITS = 0x1FF  # One bit per digit, bit 0 is digit 1
+DEFAULT_BLOCK_SIZE = 65536
+
+# The bit of every byte value: 0 and values above 9 have none
+DIGIT_BITS = np.zeros(256, dtype=np.uint16)
+DIGIT_BITS[1:10] = 1 << np.arange(9, dtype=np.uint16)
+
+def _valid_block(boards, puzzles):
+    """
+    Checks a block of boards.
+
+    Parameters:
+    - boards (ndarray): An (n, 9, 9) uint8 array of solved boards.
+    - puzzles (ndarray): An (n, 9, 9) uint8 array of puzzles, or None.
+
+    Returns:
+    - ndarray: An (n,) boolean array, True where the board is valid.
+    """
+    bits = DIGIT_BITS[boards]
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    # (n, band, row in band, stack, column in stack) -> reduce within each box
+    boxes = np.bitwise_or.reduce(bits.reshape(-1, 3, 3, 3, 3), axis=(2, 4)).reshape(-1, 9)
+    valid = ((rows == ALL_DIGITS).all(axis=1)
+             & (cols == ALL_DIGITS).all(axis=1)
+             & (boxes == ALL_DIGITS).all(axis=1))
+    if puzzles is not None:
+        valid &= ~((puzzles != 0) & (puzzles != boards)).any(axis=(1, 2))
+    return valid
+
+def validate_boards(boards, puzzles=None, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Checks that every board is a completed, valid Sudoku and, if puzzles are given,
+    that each board keeps the givens of its puzzle.
+
+    Parameters:
+    - boards (ndarray): An (N, 9, 9) uint8 array of solved boards.
+    - puzzles (ndarray): An (N, 9, 9) uint8 array of puzzles with 0 for empty
+      cells, or None to check the boards on their own.
+    - block_size (int): The number of boards checked per vectorized step.
+
+    Returns:
+    - mask (ndarray): An (N,) boolean array, True where the board is valid.
+    - failures (ndarray): The indices of the invalid boards.
+    """
+    boards = np.asarray(boards, dtype=np.uint8)
+    if boards.ndim != 3 or boards.shape[1:] != (9, 9):
+        raise ValueError(f"Expected an (N, 9, 9) array of boards, got shape {boards.shape}")
+    if puzzles is not None:
+        puzzles = np.asarray(puzzles, dtype=np.uint8)
+        if puzzles.shape != boards.shape:
+            raise ValueError(f"Puzzles of shape {puzzles.shape} do not match boards of shape {boards.shape}")
+
+    mask = np.empty(len(boards), dtype=bool)
+    for start in range(0, len(boards), block_size):
+        stop = start + block_size
+        mask[start:stop] = _valid_block(boards[start:stop], None if puzzles is None else puzzles[start:stop])
+    return mask, np.flatnonzero(~mask)
+
+def decode_records(records):
+    """
+    Decodes puzzle bank records into puzzle and solution arrays.
+
+    Parameters:
+    - records (buffer): Consecutive RECORD_SIZE byte records, e.g. from
+      PuzzleBank.records.
+
+    Returns:
+    - puzzles (ndarray): An (N, 9, 9) uint8 array of puzzles, with 0 for empty cells.
+    - solutions (ndarray): An (N, 9, 9) uint8 array of solutions.
+    """
+    raw = np.frombuffer(records, dtype=np.uint8).reshape(-1, RECORD_SIZE)
+    packed = raw[:, :SOLUTION_BYTES]
+    # Two cells per byte, high nibble first; the last low nibble is padding
+    cells = np.empty((len(raw), SOLUTION_BYTES * 2), dtype=np.uint8)
+    cells[:, 0::2] = packed >> 4
+    cells[:, 1::2] = packed & 0x0F
+    solutions = cells[:, :81].reshape(-1, 9, 9)
+    givens = np.unpackbits(raw[:, SOLUTION_BYTES:SOLUTION_BYTES + GIVENS_BYTES], axis=1, bitorder="little")
+    puzzles = (solutions.reshape(-1, 81) * givens[:, :81]).reshape(-1, 9, 9)
+    return puzzles, solutions
+
+def validate_bank(bank, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Checks every record of a puzzle bank: each solution must be a valid, completed
+    board.
+
+    The givens are stored as a mask over the solution, so they always agree with
+    it; the check that matters for a bank is the solution itself.
+
+    Parameters:
+    - bank (PuzzleBank): The open puzzle bank.
+    - block_size (int): The number of records decoded and checked per step.
+
+    Returns:
+    - dict: For each difficulty level, the indices of the invalid records within
+      the level.
+    """
+    failures = {}
+    for difficulty in sorted(bank.levels):
+        records = bank.records(difficulty)
+        level_failures = []
+        step = block_size * RECORD_SIZE
+        for start in range(0, len(records), step):
+            _, solutions = decode_records(records[start:start + step])
+            _, failed = validate_boards(solutions, block_size=block_size)
+            level_failures.append(failed + start // RECORD_SIZE)
+        records.release()
+        failures[difficulty] = np.concatenate(level_failures) if level_failures else np.empty(0, dtype=np.intp)
+    return failures
+
+def main(argv=None):
+    """
+    Parses the command-line arguments and checks every record of a puzzle bank.
+    Exits with status 1 if any record is invalid.
+
+    Parameters:
+    - argv (list): The command-line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Check every puzzle in a puzzle bank.")
+    parser.add_argument("bank", help="path of the puzzle bank file")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="records checked per step")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    with PuzzleBank(args.bank) as bank:
+        total = len(bank)
+        failures = validate_bank(bank, args.block_size)
+    elapsed = time.perf_counter() - start_time
+
+    failed = 0
+    for difficulty, indices in failures.items():
+        failed += len(indices)
+        for index in indices:
+            print(f"Invalid puzzle {index} at difficulty {difficulty}")
+    print(f"Checked {total} puzzles in {elapsed:.2f}s: {failed} invalid", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
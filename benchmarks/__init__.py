@@ -0,0 +1,18 @@
+"""
+benchmarks
+
+This package measures the hot paths of the game: puzzle generation, uniqueness
+checks, drawing the board, handling input events and replaying recorded sessions.
+Run it from the project root:
+
+    python -m benchmarks [--output results.json] [--compare baseline.json]
+
+Modules:
+- harness: Timing, memory and result comparison helpers.
+- corpus: Fixed boards used by the solver benchmarks.
+- bench_generation: create_sudoku_grid throughput and latency.
+- bench_solver: has_unique_solution on easy, hard and near-empty boards.
+- bench_render: draw_cells plus draw_grid frame time.
+- bench_input: handle_key_press and handle_tab_key cost per event.
+- bench_replay: Cost per event of replaying recorded game sessions.
+"""
@@ -0,0 +1,85 @@
+"""
+__main__.py
+
+This file runs the benchmarks from the command line. The display is opened with the
+dummy video driver unless SDL_VIDEODRIVER is already set, so the benchmarks run
+without a screen.
+
+Usage:
+    python -m benchmarks [--output results.json] [--compare baseline.json]
+                         [--threshold 0.1] [--only AREA ...] [--scale 1.0]
+                         [--sessions DIR]
+
+With --compare, the run fails with exit status 1 if any metric is worse than in the
+baseline file by more than the threshold.
+
+Functions:
+- main(argv): Parses the arguments, runs the benchmarks and writes the results.
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from benchmarks import bench_generation, bench_input, bench_render, bench_replay, bench_solver
+from benchmarks.harness import compare, load_results, write_results
+from renderer import WINDOW_SIZE
+
+AREAS = {
+    "generation": bench_generation.run,
+    "uniqueness": bench_solver.run,
+    "render": bench_render.run,
+    "input": bench_input.run,
+    "replay": bench_replay.run,
+}
+
+def main(argv=None):
+    """
+    Parses the command-line arguments, runs the benchmarks and writes the results.
+
+    Parameters:
+    - argv (list): The command-line arguments, defaults to sys.argv[1:].
+
+    Returns:
+    - int: The exit status, 1 if a metric regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the Sudoku game hot paths.")
+    parser.add_argument("--output", default="-", help="path of the JSON result file, - for standard output")
+    parser.add_argument("--compare", metavar="BASELINE", help="result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative regression, e.g. 0.1 for 10%%")
+    parser.add_argument("--only", nargs="+", choices=sorted(AREAS), help="areas to benchmark, all by default")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the amount of work, e.g. 0.1 for a quick run")
+    parser.add_argument("--sessions", metavar="DIR", help="folder of recorded sessions to replay, benchmarks/sessions by default")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+
+    metrics = {}
+    for area in args.only or AREAS:
+        print(f"Running {area}...", file=sys.stderr)
+        if area == "replay":
+            metrics.update(bench_replay.run(args.scale, args.sessions))
+        else:
+            metrics.update(AREAS[area](args.scale))
+    pygame.quit()
+
+    for name, entry in sorted(metrics.items()):
+        print(f"{name:40} {entry['value']:>12.3f} {entry['unit']}", file=sys.stderr)
+    write_results(args.output, metrics)
+
+    if args.compare:
+        regressions = compare(load_results(args.compare), metrics, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:.3f} -> {new:.3f} ({change:+.1%})", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+bench_generation.py
+
+This file measures create_sudoku_grid: puzzles generated per second, the p50 and
+p99 latency of a single puzzle, and the peak memory of generating one. The latency
+of a 16x16 puzzle, which goes through the exact-cover solver, is measured too.
+
+Functions:
+- run(scale): Runs the benchmark and returns its metrics.
+"""
+
+from benchmarks.harness import latency_metrics, metric, peak_memory, time_calls
+from sudoku_generator import create_sudoku_grid
+
+PUZZLES = 200
+LARGE_PUZZLES = 10
+LARGE_SIZE = 16
+
+def run(scale=1.0):
+    """
+    Runs the benchmark.
+
+    Parameters:
+    - scale (float): Multiplies the number of puzzles generated.
+
+    Returns:
+    - dict: The metrics, keyed by name.
+    """
+    create_sudoku_grid()  # Warm up
+    samples = time_calls(create_sudoku_grid, max(10, int(PUZZLES * scale)))
+    metrics = latency_metrics("generation", samples, "puzzles/s")
+    metrics["generation.peak_kib"] = metric(peak_memory(create_sudoku_grid), "KiB")
+    samples = time_calls(lambda: create_sudoku_grid(size=LARGE_SIZE), max(3, int(LARGE_PUZZLES * scale)))
+    metrics.update(latency_metrics(f"generation_{LARGE_SIZE}x{LARGE_SIZE}", samples, "puzzles/s"))
+    return metrics
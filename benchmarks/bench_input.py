@@ -0,0 +1,59 @@
+"""
+bench_input.py
+
+This file measures the cost of handling one input event: a digit key with
+handle_key_press and a Tab key with handle_tab_key. The display must be set up
+before run() is called, e.g. with SDL_VIDEODRIVER=dummy.
+
+Functions:
+- run(scale): Runs the benchmark and returns its metrics.
+"""
+
+import itertools
+import pygame
+from benchmarks import corpus
+from benchmarks.harness import latency_metrics, metric, peak_memory, time_calls
+from board import Board
+from events import handle_key_press, handle_tab_key
+from solver import solve_board
+
+EVENTS = 5000
+
+# Every digit, then clearing the cell again
+DIGIT_KEYS = [pygame.K_1 + offset for offset in range(9)] + [pygame.K_KP0]
+
+def run(scale=1.0):
+    """
+    Runs the benchmark.
+
+    Parameters:
+    - scale (float): Multiplies the number of events handled.
+
+    Returns:
+    - dict: The metrics, keyed by name.
+    """
+    puzzle = corpus.parse(corpus.EASY[0])
+    solution = solve_board(puzzle)
+    board = Board(puzzle, solution)
+    events = max(100, int(EVENTS * scale))
+
+    cell = next(cell for cell in board.cells if cell.active)
+    cell.set_selected(True)
+    keys = itertools.cycle(DIGIT_KEYS)
+
+    def key_press():
+        handle_key_press(cell, board, cell.row, cell.col, next(keys), solution)
+
+    metrics = latency_metrics("input.key_press", time_calls(key_press, events), "events/s")
+    metrics["input.key_press.peak_kib"] = metric(peak_memory(key_press), "KiB")
+
+    tab = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_TAB, mod=0)
+    selected = [cell]
+
+    def tab_press():
+        selected[0].set_selected(False)
+        selected[0] = handle_tab_key(board, selected[0], tab)
+
+    metrics.update(latency_metrics("input.tab_key", time_calls(tab_press, events), "events/s"))
+    metrics["input.tab_key.peak_kib"] = metric(peak_memory(tab_press), "KiB")
+    return metrics
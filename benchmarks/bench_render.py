@@ -0,0 +1,57 @@
+"""
+bench_render.py
+
+This file measures drawing the board: a full frame with draw_cells and draw_grid,
+and a frame of the BoardRenderer that redraws a single changed cell. The display
+must be set up before run() is called, e.g. with SDL_VIDEODRIVER=dummy.
+
+Functions:
+- run(scale): Runs the benchmark and returns its metrics.
+"""
+
+import pygame
+from benchmarks import corpus
+from benchmarks.harness import latency_metrics, metric, peak_memory, time_calls
+from board import Board
+from cell import WHITE
+from renderer import BoardRenderer, WINDOW_SIZE
+from solver import solve_board
+from utils import draw_cells, draw_grid
+
+FRAMES = 500
+
+def run(scale=1.0):
+    """
+    Runs the benchmark.
+
+    Parameters:
+    - scale (float): Multiplies the number of frames drawn.
+
+    Returns:
+    - dict: The metrics, keyed by name.
+    """
+    surface = pygame.display.get_surface()
+    puzzle = corpus.parse(corpus.EASY[0])
+    board = Board(puzzle, solve_board(puzzle))
+    frames = max(20, int(FRAMES * scale))
+
+    def full_frame():
+        surface.fill(WHITE)
+        draw_cells(surface, board)
+        draw_grid(surface)
+
+    full_frame()  # Warm up the glyph cache
+    metrics = latency_metrics("render.full_frame", time_calls(full_frame, frames), "frames/s")
+    metrics["render.full_frame.peak_kib"] = metric(peak_memory(full_frame), "KiB")
+
+    renderer = BoardRenderer(WINDOW_SIZE)
+    renderer.render(surface, board)
+    cell = next(cell for cell in board.cells if cell.active)
+
+    def dirty_frame():
+        cell.set_selected(not cell.selected)
+        renderer.render(surface, board)
+
+    metrics.update(latency_metrics("render.dirty_frame", time_calls(dirty_frame, frames), "frames/s"))
+    metrics["render.dirty_frame.peak_kib"] = metric(peak_memory(dirty_frame), "KiB")
+    return metrics
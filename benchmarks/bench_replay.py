@@ -0,0 +1,54 @@
+"""
+bench_replay.py
+
+This file replays recorded game sessions (see recording.py) as fast as possible and
+measures the cost of each event, handling and drawing included, so real player
+sessions can serve as workloads. Recordings are read from benchmarks/sessions, or
+the folder given with --sessions; without any, the benchmark reports no metrics.
+The display must be set up before run() is called, e.g. with SDL_VIDEODRIVER=dummy.
+
+Functions:
+- run(scale, sessions): Runs the benchmark and returns its metrics.
+"""
+
+import glob
+import os
+import pygame
+from benchmarks.harness import latency_metrics
+from recording import load_recording, replay, start_board
+from renderer import BoardRenderer, board_pixels
+
+SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
+ROUNDS = 5
+
+def run(scale=1.0, sessions=None):
+    """
+    Runs the benchmark.
+
+    Parameters:
+    - scale (float): Multiplies the number of times each session is replayed.
+    - sessions (str): The folder of .rec files, defaults to benchmarks/sessions.
+
+    Returns:
+    - dict: The metrics, keyed by name, or an empty dict if there are no recordings.
+    """
+    paths = sorted(glob.glob(os.path.join(sessions or SESSIONS_DIR, "*.rec")))
+    if not paths:
+        return {}
+    recordings = [load_recording(path) for path in paths]
+    rounds = max(1, int(ROUNDS * scale))
+
+    window_size = pygame.display.get_surface().get_size()
+    samples = []
+    for recording in recordings:
+        size = start_board(recording)[0].size
+        pixels = board_pixels(size)
+        surface = pygame.display.set_mode((pixels, pixels))
+        for _ in range(rounds):
+            result = replay(recording, renderer=BoardRenderer(pixels, size), surface=surface)
+            samples.extend(result.latencies)
+    pygame.display.set_mode(window_size)
+
+    if not samples:
+        return {}
+    return latency_metrics("replay.event", samples, "events/s")
@@ -0,0 +1,44 @@
+"""
+bench_solver.py
+
+This file measures has_unique_solution on the fixed easy, hard and near-empty
+corpora, reporting the checks per second, the p50 and p99 latency of a check and
+the peak memory of checking every board of a corpus once.
+
+Functions:
+- run(scale): Runs the benchmark and returns its metrics.
+"""
+
+from benchmarks import corpus
+from benchmarks.harness import latency_metrics, metric, peak_memory, time_calls
+from sudoku_generator import has_unique_solution
+
+PASSES = 40  # Times each corpus is checked
+
+def run(scale=1.0):
+    """
+    Runs the benchmark.
+
+    Parameters:
+    - scale (float): Multiplies the number of passes over each corpus.
+
+    Returns:
+    - dict: The metrics, keyed by name.
+    """
+    metrics = {}
+    passes = max(2, int(PASSES * scale))
+    for name in corpus.CORPORA:
+        boards = corpus.load(name)
+        samples = []
+        for board in boards:
+            has_unique_solution(board)  # Warm up
+            samples.extend(time_calls(lambda: has_unique_solution(board), passes))
+
+        def check_all():
+            for board in boards:
+                has_unique_solution(board)
+
+        prefix = f"uniqueness.{name}"
+        metrics.update(latency_metrics(prefix, samples, "checks/s"))
+        metrics[f"{prefix}.peak_kib"] = metric(peak_memory(check_all), "KiB")
+    return metrics
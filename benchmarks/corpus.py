@@ -0,0 +1,63 @@
+"""
+corpus.py
+
+This file contains the fixed boards used by the solver benchmarks, as 81-character
+strings with 0 for empty cells. The boards never change, so results from different
+runs can be compared.
+
+Functions:
+- parse(text): Turns an 81-character string into a 9x9 board.
+- load(name): Returns the boards of a corpus as 9x9 boards.
+"""
+
+# Puzzles from generate_puzzle(41, random.Random(seed)) for seeds 0-4, solved by singles alone
+EASY = (
+    "000001039053090000107200400020310097316072500904060120005620014231800900609137000",
+    "008015400041700800000006715010803904394000286006024501802050300450000092139040600",
+    "000000000080047005021000000000925706090806503567031298300754602258019400740280100",
+    "000531980000080003804090000908100652301062079720050341672340000510007090000600237",
+    "000051000896300002004280307315600824640835079000012050580703000703049001020100030",
+)
+
+# Well-known hard puzzles, including a minimal 17-given one, that make the solver search
+HARD = (
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "100007090030020008009600500005300900010080002600004000300000010040000007007000300",
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+    "000000012000000003002300400001800005060070800000009000008500000900040500470006000",
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+)
+
+# Boards with very few givens, which have many solutions
+NEAR_EMPTY = (
+    "0" * 81,
+    "123456789" + "0" * 72,
+    "100000000000020000000000300000000000000040000000000000005000000000600000000000007",
+    "000000000000000000000000000000000000000000000000000000000000000000000000987654321",
+)
+
+CORPORA = {"easy": EASY, "hard": HARD, "near_empty": NEAR_EMPTY}
+
+def parse(text):
+    """
+    Turns an 81-character string into a 9x9 board.
+
+    Parameters:
+    - text (str): The cells row by row, with 0 for empty cells.
+
+    Returns:
+    - list: The 9x9 board.
+    """
+    return [[int(char) for char in text[row * 9:row * 9 + 9]] for row in range(9)]
+
+def load(name):
+    """
+    Returns the boards of a corpus.
+
+    Parameters:
+    - name (str): "easy", "hard" or "near_empty".
+
+    Returns:
+    - list: The 9x9 boards.
+    """
+    return [parse(text) for text in CORPORA[name]]
@@ -0,0 +1,186 @@
+"""
+harness.py
+
+This file contains the helpers shared by the benchmarks: timing a function call by
+call, summarizing the samples, measuring peak memory, and writing and comparing
+result files.
+
+Every metric is stored with its unit and whether a lower or a higher value is
+better, so a result file can be compared against a baseline without knowing which
+benchmark produced it.
+
+Functions:
+- time_calls(func, count): Times count calls of func.
+- percentile(samples, fraction): Returns a nearest-rank percentile.
+- latency_metrics(prefix, samples): Builds the throughput and latency metrics.
+- peak_memory(func): Measures the peak memory allocated while func runs.
+- metric(value, unit, better): Builds one metric entry.
+- write_results(path, metrics): Writes the metrics and run information as JSON.
+- load_results(path): Reads a result file.
+- compare(baseline, current, threshold): Finds the metrics that regressed.
+"""
+
+import json
+import platform
+import time
+import tracemalloc
+
+LOWER = "lower"
+HIGHER = "higher"
+
+def time_calls(func, count):
+    """
+    Times count calls of func.
+
+    Parameters:
+    - func (callable): The function to time, called with no arguments.
+    - count (int): The number of calls.
+
+    Returns:
+    - list: The duration of each call in seconds.
+    """
+    clock = time.perf_counter
+    samples = []
+    for _ in range(count):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    return samples
+
+def percentile(samples, fraction):
+    """
+    Returns the nearest-rank percentile of the samples.
+
+    Parameters:
+    - samples (list): The samples.
+    - fraction (float): The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+    - float: The sample at that percentile.
+    """
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[rank]
+
+def latency_metrics(prefix, samples, rate_unit="calls/s"):
+    """
+    Builds the throughput, mean, p50 and p99 metrics for a set of timed calls.
+
+    Parameters:
+    - prefix (str): The prefix of the metric names.
+    - samples (list): The duration of each call in seconds.
+    - rate_unit (str): The unit of the throughput metric.
+
+    Returns:
+    - dict: The metrics, keyed by name.
+    """
+    total = sum(samples)
+    return {
+        f"{prefix}.per_sec": metric(len(samples) / total, rate_unit, HIGHER),
+        f"{prefix}.mean_ms": metric(total / len(samples) * 1e3, "ms", LOWER),
+        f"{prefix}.p50_ms": metric(percentile(samples, 0.50) * 1e3, "ms", LOWER),
+        f"{prefix}.p99_ms": metric(percentile(samples, 0.99) * 1e3, "ms", LOWER),
+    }
+
+def peak_memory(func):
+    """
+    Measures the peak memory allocated by Python while func runs. It is measured in
+    a separate run, since tracing allocations slows the code down.
+
+    Parameters:
+    - func (callable): The function to measure, called once with no arguments.
+
+    Returns:
+    - float: The peak traced memory in KiB.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def metric(value, unit, better=LOWER):
+    """
+    Builds one metric entry.
+
+    Parameters:
+    - value (float): The measured value.
+    - unit (str): The unit of the value.
+    - better (str): LOWER or HIGHER, the direction in which the value improves.
+
+    Returns:
+    - dict: The metric entry.
+    """
+    return {"value": value, "unit": unit, "better": better}
+
+def write_results(path, metrics):
+    """
+    Writes the metrics and information about the run as JSON.
+
+    Parameters:
+    - path (str): The path of the result file, or "-" for standard output.
+    - metrics (dict): The metrics, keyed by name.
+    """
+    try:
+        import pygame
+        pygame_version = pygame.version.ver
+    except ImportError:
+        pygame_version = None
+    results = {
+        "run": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "pygame": pygame_version,
+        },
+        "metrics": metrics,
+    }
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w", encoding="utf-8") as result_file:
+            result_file.write(text + "\n")
+
+def load_results(path):
+    """
+    Reads a result file.
+
+    Parameters:
+    - path (str): The path of the result file.
+
+    Returns:
+    - dict: The metrics, keyed by name.
+    """
+    with open(path, encoding="utf-8") as result_file:
+        return json.load(result_file)["metrics"]
+
+def compare(baseline, current, threshold):
+    """
+    Finds the metrics that got worse than the baseline by more than the threshold.
+    Metrics missing from either side are skipped.
+
+    Parameters:
+    - baseline (dict): The baseline metrics, keyed by name.
+    - current (dict): The current metrics, keyed by name.
+    - threshold (float): The allowed relative change, e.g. 0.1 for 10%.
+
+    Returns:
+    - list: The name, baseline value, current value and relative change of each
+      regressed metric.
+    """
+    regressions = []
+    for name in sorted(baseline.keys() & current.keys()):
+        old = baseline[name]["value"]
+        new = current[name]["value"]
+        if old == 0:
+            continue
+        change = (new - old) / old
+        if current[name]["better"] == HIGHER:
+            change = -change
+        if change > threshold:
+            regressions.append((name, old, new, change))
+    return regressions
@@ -0,0 +1,291 @@
+"""
+board.py
+
+This file defines the Board class, which holds the state of a Sudoku puzzle. Digits
+are stored in a flat bytearray, and per-row, per-column and per-box digit masks plus
+a running count of correct cells make move validation and completion checks O(1).
+Pencil-mark notes are stored as one bit mask per cell and are updated
+incrementally: placing a digit only touches the notes of the cell's peers.
+Every digit change is recorded in a MoveJournal, which backs undo, redo and saving.
+
+Boards of side 4, 9, 16 and 25 are supported; the size follows from the puzzle.
+
+Class:
+- Board: The state of a Sudoku puzzle, indexable as a grid of cells.
+"""
+
+from array import array
+from cell import Cell
+from journal import MoveJournal
+from tables import active_order, get_tables, next_active, prev_active
+
+class Board:
+    """
+    The state of a Sudoku puzzle. board[row][col] returns the Cell at that position,
+    so a Board can be used wherever a grid of cells is expected.
+
+    Attributes:
+    - size (int): The side of the board, e.g. 9.
+    - tables (Tables): The index tables of the board size.
+    - digits (bytearray): The current digit of each cell, 0 if empty.
+    - solution (bytes): The solution digit of each cell.
+    - givens (bytes): 1 for each fixed cell, 0 for each editable cell.
+    - rows (list): The digits present in each row, one bit per digit.
+    - cols (list): The digits present in each column, one bit per digit.
+    - boxes (list): The digits present in each box, one bit per digit.
+    - correct (int): The number of cells holding their solution digit.
+    - cells (list): The cells in row-major order.
+    - editable (list): The flat indices of the editable cells, in reading order.
+    - notes (array): The pencil marks of each cell, one bit per digit.
+    - notes_mode (bool): Whether digit keys toggle notes instead of placing digits.
+    - journal (MoveJournal): The moves made on the board.
+    """
+    def __init__(self, puzzle, solution):
+        """
+        Parameters:
+        - puzzle (list): The puzzle board, with 0 for empty cells.
+        - solution (list): The solution board.
+        """
+        self.size = size = len(puzzle)
+        self.tables = get_tables(size)
+        self.solution = bytes(digit for row in solution for digit in row)
+        self.givens = bytes(1 if digit else 0 for row in puzzle for digit in row)
+        self.digits = bytearray(digit or 0 for row in puzzle for digit in row)
+        self.cells = [Cell(self, index) for index in range(size * size)]
+        self._grid = [self.cells[row * size:row * size + size] for row in range(size)]
+        self.editable = active_order(self.givens)
+        # 16 bits hold the notes of boards up to 16x16, larger boards need 32
+        self.notes = array("H" if size <= 16 else "L", [0]) * (size * size)
+        self.notes_mode = False
+        self.journal = MoveJournal(wide=size > 9)
+        self._recount()
+
+    def __getitem__(self, row):
+        return self._grid[row]
+
+    def __iter__(self):
+        return iter(self._grid)
+
+    def __len__(self):
+        return self.size
+
+    def _recount(self):
+        """
+        Rebuilds the digit masks and the correct count from the digits.
+        """
+        tables = self.tables
+        self.rows = [0] * self.size
+        self.cols = [0] * self.size
+        self.boxes = [0] * self.size
+        self.correct = 0
+        for index, digit in enumerate(self.digits):
+            if digit:
+                bit = 1 << (digit - 1)
+                self.rows[tables.row_of[index]] |= bit
+                self.cols[tables.col_of[index]] |= bit
+                self.boxes[tables.box_of[index]] |= bit
+                if digit == self.solution[index]:
+                    self.correct += 1
+
+    def is_valid_move(self, row, col, number):
+        """
+        Checks if a number can be placed in a cell based on Sudoku rules.
+
+        Parameters:
+        - row (int): The row index of the move.
+        - col (int): The column index of the move.
+        - number (int): The number to be placed in the cell.
+
+        Returns:
+        - bool: True if the number is not yet in the cell's row, column or box.
+        """
+        used = self.rows[row] | self.cols[col] | self.boxes[self.tables.box_of[row * self.size + col]]
+        return not used & (1 << (number - 1))
+
+    def set_digit(self, index, digit, record=True):
+        """
+        Sets the digit of an editable cell and updates the masks and correct count.
+        Moves are validated before they are made, so a digit never appears twice in
+        a row, column or box and clearing its bit is always safe.
+
+        Parameters:
+        - index (int): The flat index of the cell.
+        - digit (int): The digit to set, 0 to clear the cell.
+        - record (bool): Whether to record the move in the journal.
+        """
+        old = self.digits[index]
+        if self.givens[index] or old == digit:
+            return
+        if record:
+            self.journal.record(index, old, digit)
+        tables = self.tables
+        row, col, box = tables.row_of[index], tables.col_of[index], tables.box_of[index]
+        if old:
+            bit = 1 << (old - 1)
+            self.rows[row] &= ~bit
+            self.cols[col] &= ~bit
+            self.boxes[box] &= ~bit
+            if old == self.solution[index]:
+                self.correct -= 1
+        if digit:
+            bit = 1 << (digit - 1)
+            self.rows[row] |= bit
+            self.cols[col] |= bit
+            self.boxes[box] |= bit
+            if digit == self.solution[index]:
+                self.correct += 1
+            self.notes[index] = 0
+            self._eliminate_note(index, bit)
+        self.digits[index] = digit
+        self.cells[index].dirty = True
+
+    def undo(self):
+        """
+        Reverts the last move in the journal.
+
+        Returns:
+        - int: The flat index of the changed cell, or None if there was nothing to undo.
+        """
+        move = self.journal.undo()
+        if move is None:
+            return None
+        index, digit = move
+        self.set_digit(index, digit, record=False)
+        return index
+
+    def redo(self):
+        """
+        Makes the last undone move again.
+
+        Returns:
+        - int: The flat index of the changed cell, or None if there was nothing to redo.
+        """
+        move = self.journal.redo()
+        if move is None:
+            return None
+        index, digit = move
+        self.set_digit(index, digit, record=False)
+        return index
+
+    def _eliminate_note(self, index, bit):
+        """
+        Removes a digit from the notes of a cell's peers.
+
+        Parameters:
+        - index (int): The flat index of the cell the digit was placed in.
+        - bit (int): The bit of the placed digit.
+        """
+        notes = self.notes
+        cells = self.cells
+        for peer in self.tables.peers[index]:
+            if notes[peer] & bit:
+                notes[peer] &= ~bit
+                cells[peer].dirty = True
+
+    def toggle_note(self, index, digit):
+        """
+        Toggles a pencil mark in an empty, editable cell. A digit that is already in
+        the cell's row, column or box cannot be noted.
+
+        Parameters:
+        - index (int): The flat index of the cell.
+        - digit (int): The digit to toggle.
+        """
+        if self.givens[index] or self.digits[index]:
+            return
+        bit = 1 << (digit - 1)
+        row, col = divmod(index, self.size)
+        if not self.notes[index] & bit and not self.is_valid_move(row, col, digit):
+            return
+        self.notes[index] ^= bit
+        self.cells[index].dirty = True
+
+    def clear_notes(self, index):
+        """
+        Removes all pencil marks from a cell.
+
+        Parameters:
+        - index (int): The flat index of the cell.
+        """
+        if self.notes[index]:
+            self.notes[index] = 0
+            self.cells[index].dirty = True
+
+    def is_complete(self):
+        """
+        Checks if every cell holds its solution digit.
+
+        Returns:
+        - bool: True if the board is complete and correct.
+        """
+        return self.correct == len(self.cells)
+
+    def next_active_cell(self, row, col):
+        """
+        Finds the editable cell after a position, wrapping around to the start.
+
+        Parameters:
+        - row (int): The current row index.
+        - col (int): The current column index, -1 to start from the row's beginning.
+
+        Returns:
+        - tuple: The row and column of the next editable cell, or (None, None).
+        """
+        index = next_active(self.editable, row * self.size + col)
+        return (None, None) if index is None else divmod(index, self.size)
+
+    def prev_active_cell(self, row, col):
+        """
+        Finds the editable cell before a position, wrapping around to the end.
+
+        Parameters:
+        - row (int): The current row index.
+        - col (int): The current column index.
+
+        Returns:
+        - tuple: The row and column of the previous editable cell, or (None, None).
+        """
+        index = prev_active(self.editable, row * self.size + col)
+        return (None, None) if index is None else divmod(index, self.size)
+
+    def puzzle_rows(self):
+        """
+        Returns the puzzle the board started from.
+
+        Returns:
+        - list: The puzzle board, with 0 for empty cells.
+        """
+        size = self.size
+        return [[self.solution[index] if self.givens[index] else 0 for index in range(row * size, row * size + size)]
+                for row in range(size)]
+
+    def solution_rows(self):
+        """
+        Returns the solution of the board.
+
+        Returns:
+        - list: The solution board.
+        """
+        size = self.size
+        return [list(self.solution[row * size:row * size + size]) for row in range(size)]
+
+    def snapshot(self):
+        """
+        Returns a copy of the digits that can be passed to restore().
+
+        Returns:
+        - bytes: The digit of each cell.
+        """
+        return bytes(self.digits)
+
+    def restore(self, snapshot):
+        """
+        Restores the digits from a snapshot and marks every cell for redrawing.
+
+        Parameters:
+        - snapshot (bytes): A snapshot taken from this board.
+        """
+        self.digits[:] = snapshot
+        self._recount()
+        for cell in self.cells:
+            cell.dirty = True
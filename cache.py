@@ -0,0 +1,250 @@
+"""
+cache.py
+
+This file defines the PuzzleCache class, which remembers the solution, the
+uniqueness and the difficulty rating of puzzles that have been seen before, so a
+known puzzle is served without any solver work.
+
+Entries are keyed by a 16-byte BLAKE2b digest of the puzzle's cells, so a puzzle
+hits only when the same cells come again; equivalent puzzles (see canonical.py)
+are separate entries. Boards of any size can be solved, but only 9x9 boards can
+be rated. A bounded number of entries is kept in memory, the least recently used
+being dropped first. When the cache is given a path, every entry is also written
+to an SQLite database that survives restarts and can be shared by several
+processes; entries dropped from memory are then read back from the database.
+
+Classes:
+- CacheEntry: The cached facts about a puzzle.
+- PuzzleCache: A bounded LRU cache of puzzle facts with an optional database.
+
+Functions:
+- puzzle_key(board): Returns the cache key of a puzzle.
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+from collections import OrderedDict, namedtuple
+from rating import Rating, rate_puzzle
+from solver import find_solutions
+
+DEFAULT_CAPACITY = 65536
+COMMIT_INTERVAL = 1000  # Database writes between commits
+BUSY_TIMEOUT = 30.0  # Seconds to wait for another process holding the database
+
+CacheEntry = namedtuple("CacheEntry", ["solution", "unique", "rating"])
+CacheEntry.__doc__ = """
+The cached facts about a puzzle.
+
+Attributes:
+- solution (list): The solution board, or None if the puzzle has none.
+- unique (bool): Whether the solution is unique.
+- rating (Rating): The difficulty rating, or None if it has not been asked for.
+"""
+
+def puzzle_key(board):
+    """
+    Returns the cache key of a puzzle.
+
+    Parameters:
+    - board (list): The puzzle board, with 0 for empty cells.
+
+    Returns:
+    - bytes: A 16-byte BLAKE2b digest of the cells of the puzzle.
+    """
+    return hashlib.blake2b(bytes(digit for row in board for digit in row), digest_size=16).digest()
+
+def _rows(cells):
+    """
+    Splits the cell bytes of a square board into its rows.
+    """
+    size = math.isqrt(len(cells))
+    return [list(cells[row * size:row * size + size]) for row in range(size)]
+
+class PuzzleCache:
+    """
+    A bounded LRU cache of puzzle solutions, uniqueness and ratings, optionally
+    backed by an SQLite database.
+
+    Every call to solve or rate counts as a hit if it needed no solver or rating
+    work, and as a miss otherwise.
+
+    Attributes:
+    - capacity (int): The number of entries kept in memory.
+    - path (str): The path of the database, or None to keep entries in memory only.
+    - hits (int): The number of calls served from the cache.
+    - misses (int): The number of calls that had to solve or rate the puzzle.
+    - disk_hits (int): The hits that were read back from the database.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries = OrderedDict()  # key -> (solution bytes or None, unique, rating)
+        self._db = None
+        self._pending = 0
+        if path is not None:
+            self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS puzzles "
+                "(key BLOB PRIMARY KEY, solution BLOB, is_unique INTEGER NOT NULL, rating TEXT)"
+            )
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get(self, key):
+        """
+        Finds an entry in memory or in the database and marks it as recently used.
+
+        Returns:
+        - tuple: The stored entry, or None if the puzzle is not cached.
+        - bool: Whether the entry was read from the database.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry, False
+        if self._db is None:
+            return None, False
+        row = self._db.execute("SELECT solution, is_unique, rating FROM puzzles WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, False
+        solution, unique, rating = row
+        if rating is not None:
+            score, level, hardest, counts = json.loads(rating)
+            rating = Rating(score, level, hardest, tuple(tuple(count) for count in counts))
+        entry = (solution, bool(unique), rating)
+        self._remember(key, entry)
+        return entry, True
+
+    def _remember(self, key, entry):
+        """
+        Keeps an entry in memory, dropping the least recently used one if full.
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _put(self, key, entry):
+        """
+        Stores an entry in memory and in the database.
+        """
+        self._remember(key, entry)
+        if self._db is None:
+            return
+        solution, unique, rating = entry
+        self._db.execute(
+            "INSERT OR REPLACE INTO puzzles (key, solution, is_unique, rating) VALUES (?, ?, ?, ?)",
+            (key, solution, int(unique), None if rating is None else json.dumps(rating)),
+        )
+        self._pending += 1
+        if self._pending >= COMMIT_INTERVAL:
+            self.flush()
+
+    def _count(self, found, from_disk):
+        """
+        Counts a call as a hit or a miss.
+        """
+        if found:
+            self.hits += 1
+            self.disk_hits += from_disk
+        else:
+            self.misses += 1
+
+    def _solved(self, board):
+        """
+        Solves a puzzle and returns its entry without a rating.
+        """
+        solutions = find_solutions(board, limit=2)
+        solution = bytes(digit for row in solutions[0] for digit in row) if solutions else None
+        return solution, len(solutions) == 1, None
+
+    def solve(self, board):
+        """
+        Returns the solution and uniqueness of a puzzle, solving it only if it is
+        not cached.
+
+        Parameters:
+        - board (list): The puzzle board, with 0 for empty cells.
+
+        Returns:
+        - CacheEntry: The cached facts about the puzzle.
+        """
+        key = puzzle_key(board)
+        entry, from_disk = self._get(key)
+        self._count(entry is not None, from_disk)
+        if entry is None:
+            entry = self._solved(board)
+            self._put(key, entry)
+        solution, unique, rating = entry
+        return CacheEntry(None if solution is None else _rows(solution), unique, rating)
+
+    def rate(self, board):
+        """
+        Returns the difficulty rating of a puzzle, rating it only if it is not
+        cached. The puzzle is solved too if it was not cached at all. Only 9x9
+        puzzles can be rated; other sizes raise ValueError.
+
+        Parameters:
+        - board (list): The 9x9 puzzle board, with 0 for empty cells.
+
+        Returns:
+        - Rating: The difficulty rating of the puzzle.
+        """
+        if len(board) != 9:
+            raise ValueError(f"Only 9x9 puzzles can be rated, not {len(board)}x{len(board)}")
+        key = puzzle_key(board)
+        entry, from_disk = self._get(key)
+        self._count(entry is not None and entry[2] is not None, from_disk)
+        if entry is None or entry[2] is None:
+            solution, unique, _ = entry or self._solved(board)
+            entry = (solution, unique, rate_puzzle(board))
+            self._put(key, entry)
+        return entry[2]
+
+    def stats(self):
+        """
+        Returns the hit and miss counters.
+
+        Returns:
+        - dict: The hits, misses, disk hits, hit rate and entries in memory.
+        """
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / calls if calls else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def flush(self):
+        """
+        Commits the pending database writes.
+        """
+        if self._db is not None and self._pending:
+            self._db.commit()
+            self._pending = 0
+
+    def close(self):
+        """
+        Commits the pending writes and closes the database.
+        """
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
@@ -3,42 +3,100 @@ cell.py
 
 This file defines the Cell class, which represents a single cell in the Sudoku grid.
 Each cell has properties such as its number, color, and whether it is active or selected.
+The digits themselves are stored in the Board the cell belongs to. This module does
+not depend on pygame; drawing a cell is done by utils.draw_cell.
 
 Class:
 - Cell: Represents a single cell in the Sudoku grid.
-"""
 
-import pygame
+Functions:
+- digit_symbol(digit): Returns the symbol a digit is shown and typed as.
+"""
 
 # Constants
 CELL_SIZE = 50
 FONT_SIZE = 32
+NOTE_FONT_SIZE = 16
+
+# Cell size, digit font size and note font size for each board side
+CELL_SIZES = {4: 80, 9: CELL_SIZE, 16: 38, 25: 28}
+FONT_SIZES = {4: 48, 9: FONT_SIZE, 16: 26, 25: 20}
+NOTE_FONT_SIZES = {4: 24, 9: NOTE_FONT_SIZE, 16: 12, 25: 10}
+
+# Digits above 9 are shown as letters, so 16x16 boards use 1-9 and A-G
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
 SKY_BLUE = (135, 206, 235)
+LIGHT_YELLOW = (255, 236, 150)  # Selection color in notes mode
+NOTE_COLOR = (90, 90, 90)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GREEN = (0, 255, 0)
 GRAY = (200, 200, 200)
 MUTED_RED = (255, 102, 102)  # Muted red
 
+def digit_symbol(digit):
+    """
+    Returns the symbol a digit is shown and typed as.
+
+    Parameters:
+    - digit (int): The digit, from 1 to 25.
+
+    Returns:
+    - str: The symbol, "1" to "9" for the first nine digits and then "A" to "P".
+    """
+    return SYMBOLS[digit - 1]
+
 class Cell:
     """
-    Represents a single cell in the Sudoku grid.
+    Represents a single cell in the Sudoku grid. A cell is a lightweight view over
+    the digit storage of its Board; only its selection and redraw state live here.
 
     Attributes:
-    - row (int): The row index of the cell.
-    - col (int): The column index of the cell.
-    - number (int): The number displayed in the cell.
-    - color (tuple): The background color of the cell.
-    - active (bool): Whether the cell is active (editable) or inactive (fixed).
+    - board (Board): The board the cell belongs to.
+    - index (int): The flat index of the cell, row * size + col.
     - selected (bool): Whether the cell is currently selected.
+    - dirty (bool): Whether the cell has changed since it was last drawn.
     """
-    def __init__(self, row, col, number, color, active):
-        self.row = row
-        self.col = col
-        self.number = number
-        self.color = color
-        self.active = active
+    __slots__ = ("board", "index", "selected", "dirty")
+
+    def __init__(self, board, index):
+        self.board = board
+        self.index = index
         self.selected = False
+        self.dirty = True
+
+    @property
+    def row(self):
+        """The row index of the cell."""
+        return self.board.tables.row_of[self.index]
+
+    @property
+    def col(self):
+        """The column index of the cell."""
+        return self.board.tables.col_of[self.index]
+
+    @property
+    def number(self):
+        """The number displayed in the cell, 0 if empty."""
+        return self.board.digits[self.index]
+
+    @property
+    def active(self):
+        """Whether the cell is active (editable) or inactive (fixed)."""
+        return not self.board.givens[self.index]
+
+    @property
+    def color(self):
+        """The background color of the cell."""
+        board = self.board
+        number = board.digits[self.index]
+        if board.givens[self.index]:
+            return GRAY
+        if number == 0:
+            return WHITE
+        if number == board.solution[self.index]:
+            return GREEN
+        return MUTED_RED
 
     def draw(self, surface):
         """
@@ -47,34 +105,29 @@ class Cell:
         Parameters:
         - surface (Surface): The Pygame surface to draw on.
         """
-        x = self.col * CELL_SIZE
-        y = self.row * CELL_SIZE
-        if self.selected:
-            pygame.draw.rect(surface, SKY_BLUE, (x, y, CELL_SIZE, CELL_SIZE))
-        else:
-            pygame.draw.rect(surface, self.color, (x, y, CELL_SIZE, CELL_SIZE))
-        if self.number != 0:
-            font = pygame.font.SysFont(None, FONT_SIZE)
-            text = font.render(str(self.number), True, BLACK)
-            text_rect = text.get_rect(center=(x + CELL_SIZE // 2, y + CELL_SIZE // 2))
-            surface.blit(text, text_rect)
-
-    def set_number(self, number, correct_number):
+        from utils import draw_cell  # Imported here so the game logic does not need pygame
+        draw_cell(surface, self)
+
+    def set_number(self, number):
         """
-        Sets the number in the cell and updates its background color.
+        Sets the number in the cell. Its background color follows from the board's
+        solution.
 
         Parameters:
-        - number (int): The number to set in the cell.
-        - correct_number (int): The correct number for the cell.
+        - number (int): The number to set in the cell, 0 to clear it.
         """
         if self.active:
-            self.number = number
-            if number == 0:
-                self.color = WHITE
-            elif number == correct_number:
-                self.color = GREEN
-            else:
-                self.color = MUTED_RED
+            self.board.set_digit(self.index, number)
+
+    def toggle_note(self, number):
+        """
+        Toggles a pencil mark in the cell.
+
+        Parameters:
+        - number (int): The number to toggle.
+        """
+        if self.active:
+            self.board.toggle_note(self.index, number)
 
     def set_selected(self, selected):
         """
@@ -83,5 +136,6 @@ class Cell:
         Parameters:
         - selected (bool): Whether the cell is selected or not.
         """
-        if self.active:
+        if self.active and self.selected != selected:
             self.selected = selected
+            self.dirty = True
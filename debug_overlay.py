@@ -0,0 +1,162 @@
+"""
+debug_overlay.py
+
+This file defines the DebugOverlay class, which measures the game loop and shows
+the results in a small panel in the corner of the window: frames per second, the
+time of a frame split into event handling and drawing, the blits per frame, and
+how long the current puzzle took to generate.
+
+The game loop only calls into the overlay while it is enabled, so it costs nothing
+when it is off. The figures are averaged and the panel text refreshed a few times a
+second, so they can be read while the game runs.
+
+Class:
+- DebugOverlay: Measures the game loop and draws the performance panel.
+"""
+
+import time
+import pygame
+
+# Constants
+PANEL_POSITION = (4, 4)
+PANEL_COLOR = (0, 0, 0, 180)
+TEXT_COLOR = (255, 255, 255)
+FONT_SIZE = 20
+PADDING = 4
+REFRESH_SECONDS = 0.5
+
+class DebugOverlay:
+    """
+    Measures the game loop and draws the performance panel.
+
+    A frame is measured from the moment its events arrive, so the time the loop
+    spends waiting for events is not counted.
+
+    Attributes:
+    - enabled (bool): Whether the overlay is shown.
+    - generation_time (float): How long the current puzzle took to generate, in
+      seconds, or None if it was not generated.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.generation_time = None
+        self._font = None
+        self._panel = None
+        self._rect = None
+        self._under = None
+        self._reset_window(time.perf_counter())
+
+    def _reset_window(self, now):
+        """
+        Starts a new averaging window.
+        """
+        self._window_start = now
+        self._frames = 0
+        self._event_time = 0.0
+        self._draw_time = 0.0
+        self._blits = 0
+
+    def toggle(self, surface):
+        """
+        Shows or hides the overlay.
+
+        Parameters:
+        - surface (Surface): The display surface.
+
+        Returns:
+        - bool: Whether the overlay is now shown.
+        """
+        if self.enabled:
+            self.restore(surface)
+            if self._rect:
+                pygame.display.update(self._rect)
+        self.enabled = not self.enabled
+        self._under = None
+        self._panel = None
+        self._reset_window(time.perf_counter())
+        self.start_frame()
+        return self.enabled
+
+    def start_frame(self):
+        """
+        Marks the start of a frame, once its events have arrived.
+        """
+        self._frame_start = time.perf_counter()
+
+    def end_events(self):
+        """
+        Marks the end of event handling and the start of drawing.
+        """
+        self._draw_start = time.perf_counter()
+
+    def end_frame(self, blits):
+        """
+        Marks the end of drawing.
+
+        Parameters:
+        - blits (int): The number of blits made to draw the frame.
+        """
+        now = time.perf_counter()
+        self._frames += 1
+        self._event_time += self._draw_start - self._frame_start
+        self._draw_time += now - self._draw_start
+        self._blits += blits
+        if now - self._window_start >= REFRESH_SECONDS or self._panel is None:
+            self._panel = self._render_panel(now - self._window_start)
+            self._reset_window(now)
+
+    def _render_panel(self, elapsed):
+        """
+        Renders the panel text for the frames of the current window.
+        """
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, FONT_SIZE)
+        frames = max(1, self._frames)
+        event_ms = self._event_time / frames * 1e3
+        draw_ms = self._draw_time / frames * 1e3
+        generation = "-" if self.generation_time is None else f"{self.generation_time * 1e3:.1f} ms"
+        lines = (
+            f"FPS: {self._frames / elapsed:.0f}" if elapsed > 0 else "FPS: -",
+            f"Frame: {event_ms + draw_ms:.2f} ms",
+            f"Events: {event_ms:.2f} ms  Draw: {draw_ms:.2f} ms",
+            f"Blits/frame: {self._blits / frames:.1f}",
+            f"Last puzzle: {generation}",
+        )
+        rendered = [self._font.render(line, True, TEXT_COLOR) for line in lines]
+        width = max(text.get_width() for text in rendered) + 2 * PADDING
+        height = sum(text.get_height() for text in rendered) + 2 * PADDING
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(PANEL_COLOR)
+        y = PADDING
+        for text in rendered:
+            panel.blit(text, (PADDING, y))
+            y += text.get_height()
+        return panel
+
+    def restore(self, surface):
+        """
+        Puts back what was under the panel, so the board can be drawn over it.
+        Call it before drawing the board.
+
+        Parameters:
+        - surface (Surface): The display surface.
+        """
+        if self._under is not None:
+            surface.blit(self._under, self._rect)
+            self._under = None
+
+    def draw(self, surface):
+        """
+        Draws the panel over the board and updates its part of the display.
+
+        Parameters:
+        - surface (Surface): The display surface.
+        """
+        if self._panel is None:
+            return
+        rect = self._panel.get_rect(topleft=PANEL_POSITION)
+        update = rect.union(self._rect) if self._rect else rect
+        self._rect = rect
+        self._under = surface.subsurface(rect).copy()
+        surface.blit(self._panel, rect)
+        pygame.display.update(update)
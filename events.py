@@ -2,18 +2,26 @@
 events.py
 
 This file handles all the event processing for the Sudoku game, including mouse clicks,
-key presses, and tab navigation.
+key presses, and tab navigation. The handlers only read the event they are given,
+not the live keyboard or mouse state, so recorded events can be replayed through
+them without a window.
 
 Functions:
 - handle_mouse_click(pos, grid, click_count): Handles mouse click events.
-- handle_key_press(cell, grid, row, col, key, solution): Handles key press events.
+- key_digit(key, size): Returns the digit a key enters on a board of a size.
+- is_command_key(key, mod, size): Checks if a letter key is a command rather than a digit.
+- handle_key_press(cell, grid, row, col, key, solution, mod): Handles key press events.
 - handle_tab_key(grid, selected_cell, event): Handles Tab and Shift+Tab key events.
+- handle_hint_key(grid): Handles the hint key.
+- handle_board_event(grid, solution, selected_cell, event, click_count): Applies a key press or click to the board.
+- handle_undo_key(grid, event): Handles the undo and redo keys.
 - is_valid_move(grid, row, col, number): Checks if a move is valid based on Sudoku rules.
 """
 
 import pygame
-from tkinter import messagebox
-from utils import focus_next_active_cell, focus_prev_active_cell, is_grid_complete, draw_cells, draw_grid
+from cell import CELL_SIZES
+from hints import find_hint
+from utils import focus_next_active_cell, focus_prev_active_cell, is_grid_complete
 
 def handle_mouse_click(pos, grid, click_count):
     """
@@ -27,19 +35,71 @@ def handle_mouse_click(pos, grid, click_count):
     Returns:
     - tuple: The row and column of the clicked cell.
     """
-    CELL_SIZE = 50
+    CELL_SIZE = CELL_SIZES[grid.size]
     x, y = pos
     row = y // CELL_SIZE
     col = x // CELL_SIZE
-    if row < 9 and col < 9:
+    if row < grid.size and col < grid.size:
         if click_count == 2:  # Double click detected
-            grid[row][col].set_number(0, 0)
+            grid[row][col].set_number(0)
         return row, col
     return None
 
-def handle_key_press(cell, grid, row, col, key, solution):
+NUMPAD_KEYS = {
+    pygame.K_KP1: 1,
+    pygame.K_KP2: 2,
+    pygame.K_KP3: 3,
+    pygame.K_KP4: 4,
+    pygame.K_KP5: 5,
+    pygame.K_KP6: 6,
+    pygame.K_KP7: 7,
+    pygame.K_KP8: 8,
+    pygame.K_KP9: 9,
+    pygame.K_KP0: 0,
+}
+
+def key_digit(key, size):
+    """
+    Returns the digit a key enters on a board of a size. The digits above 9 of the
+    larger boards are entered with the letters A, B, C and so on.
+
+    Parameters:
+    - key (int): The key that was pressed.
+    - size (int): The side of the board.
+
+    Returns:
+    - int: The digit, 0 to clear the cell, or None if the key enters no digit.
+    """
+    if pygame.K_1 <= key <= pygame.K_9:
+        number = key - pygame.K_0
+    elif key in NUMPAD_KEYS:
+        number = NUMPAD_KEYS[key]
+    elif pygame.K_a <= key <= pygame.K_z:
+        number = key - pygame.K_a + 10
+    else:
+        return None
+    return number if number <= size else None
+
+def is_command_key(key, mod, size):
+    """
+    Checks if a letter key is a command, such as N for notes mode, rather than a
+    digit. On boards where the letter is also a digit, the command needs Ctrl.
+
+    Parameters:
+    - key (int): The key that was pressed.
+    - mod (int): The modifier keys held down.
+    - size (int): The side of the board.
+
+    Returns:
+    - bool: True if the key should run its command.
     """
-    Handles key press events to enter numbers into the selected cell.
+    return bool(mod & pygame.KMOD_CTRL) or key_digit(key, size) is None
+
+def handle_key_press(cell, grid, row, col, key, solution, mod=0):
+    """
+    Handles key press events to enter numbers into the selected cell. The N key
+    (Ctrl+N on boards where N is a digit) toggles notes mode, in which numbers are
+    toggled as pencil marks instead.
 
     Parameters:
     - cell (Cell): The currently selected cell.
@@ -48,48 +108,34 @@ def handle_key_press(cell, grid, row, col, key, solution):
     - col (int): The column index of the selected cell.
     - key (int): The key that was pressed.
     - solution (list): The solution to the Sudoku puzzle.
+    - mod (int): The modifier keys held down.
+
+    Returns:
+    - str: "home_screen" if the move completed the puzzle, otherwise None.
     """
-    numpad_keys = {
-        pygame.K_KP1: 1,
-        pygame.K_KP2: 2,
-        pygame.K_KP3: 3,
-        pygame.K_KP4: 4,
-        pygame.K_KP5: 5,
-        pygame.K_KP6: 6,
-        pygame.K_KP7: 7,
-        pygame.K_KP8: 8,
-        pygame.K_KP9: 9,
-        pygame.K_KP0: 0,
-    }
-
-    if key in range(pygame.K_1, pygame.K_9 + 1):
-        number = key - pygame.K_0
-    elif key in numpad_keys:
-        number = numpad_keys[key]
-    else:
-        number = None
+    if key == pygame.K_n and is_command_key(key, mod, grid.size):
+        grid.notes_mode = not grid.notes_mode
+        cell.dirty = True  # The selection color shows the mode
+        return None
+
+    number = None if mod & pygame.KMOD_CTRL else key_digit(key, grid.size)
 
     if number is not None:
-        if number == 0:
-            cell.set_number(0, 0)
+        if grid.notes_mode:
+            if number == 0:
+                grid.clear_notes(cell.index)
+            else:
+                cell.toggle_note(number)
+        elif number == 0:
+            cell.set_number(0)
         else:
             if is_valid_move(grid, row, col, number):
-                correct_number = solution[row][col]
-                cell.set_number(number, correct_number)
+                cell.set_number(number)
             else:
                 # Provide some feedback for invalid moves (optional)
                 cell.set_selected(True)
 
-        # Redraw the cells and grid to update the display
-        window = pygame.display.get_surface()
-        window.fill((255, 255, 255))
-        draw_cells(window, grid)
-        draw_grid(window)
-        pygame.display.flip()
-
         if is_grid_complete(grid, solution):
-            pygame.time.delay(100)  # Small delay to ensure the display updates
-            messagebox.showinfo("Congratulations!", "You have completed the Sudoku puzzle!")
             return "home_screen"
 
 def handle_tab_key(grid, selected_cell, event):
@@ -106,7 +152,7 @@ def handle_tab_key(grid, selected_cell, event):
     """
     if selected_cell:
         row, col = selected_cell.row, selected_cell.col
-        if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+        if event.mod & pygame.KMOD_SHIFT:
             prev_row, prev_col = focus_prev_active_cell(grid, row, col)
             if prev_row is not None and prev_col is not None:
                 selected_cell = grid[prev_row][prev_col]
@@ -123,12 +169,93 @@ def handle_tab_key(grid, selected_cell, event):
             selected_cell.set_selected(True)
     return selected_cell
 
+def handle_hint_key(grid):
+    """
+    Handles the hint key by filling the next logically deducible cell.
+
+    Parameters:
+    - grid (Board): The Sudoku grid.
+
+    Returns:
+    - Hint: The hint that was applied, or None if the grid is already complete.
+    """
+    hint = find_hint(grid)
+    if hint is not None:
+        grid.set_digit(hint.index, hint.digit)
+    return hint
+
+def handle_board_event(grid, solution, selected_cell, event, click_count=1):
+    """
+    Applies a key press or mouse click to the board: selecting a cell, Tab
+    navigation, undo and redo, hints, and entering numbers or notes. Keys that
+    control the window, such as Escape, are left to the game loop.
+
+    Parameters:
+    - grid (Board): The Sudoku grid.
+    - solution (list): The solution to the Sudoku puzzle.
+    - selected_cell (Cell): The currently selected cell, or None.
+    - event (Event): A KEYDOWN or MOUSEBUTTONDOWN event.
+    - click_count (int): The number of clicks in a row, 2 for a double click.
+
+    Returns:
+    - Cell: The selected cell after the event, or None.
+    - str: "home_screen" if the event completed the puzzle, otherwise None.
+    - Hint: The hint that was applied, or None.
+    """
+    result = None
+    hint = None
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        cell_pos = handle_mouse_click(event.pos, grid, click_count)
+        if cell_pos:
+            if selected_cell:
+                selected_cell.set_selected(False)
+            row, col = cell_pos
+            selected_cell = grid[row][col] if grid[row][col].active else None
+            if selected_cell:
+                selected_cell.set_selected(True)
+    elif event.key == pygame.K_TAB:
+        if selected_cell:
+            selected_cell.set_selected(False)
+        selected_cell = handle_tab_key(grid, selected_cell, event)
+    elif event.key in (pygame.K_z, pygame.K_y) and event.mod & pygame.KMOD_CTRL:
+        index = handle_undo_key(grid, event)
+        if index is not None and grid.is_complete():
+            result = "home_screen"
+    elif event.key == pygame.K_h and is_command_key(event.key, event.mod, grid.size):
+        hint = handle_hint_key(grid)
+        if hint:
+            if selected_cell:
+                selected_cell.set_selected(False)
+            selected_cell = grid.cells[hint.index]
+            selected_cell.set_selected(True)
+            if grid.is_complete():
+                result = "home_screen"
+    elif selected_cell:
+        result = handle_key_press(selected_cell, grid, selected_cell.row, selected_cell.col, event.key, solution,
+                                  event.mod)
+    return selected_cell, result, hint
+
+def handle_undo_key(grid, event):
+    """
+    Handles Ctrl+Z to undo the last move, and Ctrl+Y or Ctrl+Shift+Z to redo it.
+
+    Parameters:
+    - grid (Board): The Sudoku grid.
+    - event (Event): The key event.
+
+    Returns:
+    - int: The flat index of the changed cell, or None if nothing changed.
+    """
+    if event.key == pygame.K_y or event.mod & pygame.KMOD_SHIFT:
+        return grid.redo()
+    return grid.undo()
+
 def is_valid_move(grid, row, col, number):
     """
     Checks if a move is valid based on Sudoku rules.
 
     Parameters:
-    - grid (list): The Sudoku grid.
+    - grid (Board): The Sudoku grid.
     - row (int): The row index of the move.
     - col (int): The column index of the move.
     - number (int): The number to be placed in the cell.
@@ -136,21 +263,4 @@ def is_valid_move(grid, row, col, number):
     Returns:
     - bool: True if the move is valid, False otherwise.
     """
-    # Check the row
-    for c in range(9):
-        if grid[row][c].number == number:
-            return False
-
-    # Check the column
-    for r in range(9):
-        if grid[r][col].number == number:
-            return False
-
-    # Check the 3x3 subgrid
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-    for r in range(start_row, start_row + 3):
-        for c in range(start_col, start_col + 3):
-            if grid[r][c].number == number:
-                return False
-
-    return True
+    return grid.is_valid_move(row, col, number)
@@ -0,0 +1,303 @@
+"""
+exact_cover.py
+
+This file contains the exact-cover solver used for boards larger than 9x9. A Sudoku
+is posed as an exact-cover problem: every candidate (cell, digit) covers four
+constraints, "the cell is filled" and "the digit appears once in the row, the column
+and the box", and a solution is a set of candidates covering every constraint
+exactly once.
+
+The problem is solved with Knuth's Algorithm X. Instead of the linked lists of
+Dancing Links, the matrix is kept as a dict mapping each constraint to the set of
+candidates covering it, which gives the same cover/uncover operations with Python's
+fast set primitives. The search always branches on the constraint with the fewest
+candidates and runs on an explicit stack, so 25x25 boards do not hit the recursion
+limit.
+
+A search can be given a node budget, the number of candidates it may try. Some
+nearly empty 25x25 boards take tens of seconds to prove unique, and a bounded
+search gives up on them instead.
+
+Functions:
+- find_solutions(board, limit=2, max_nodes=None): Returns up to limit solutions of a board.
+- count_solutions(board, limit=2, max_nodes=None): Counts the solutions of a board, stopping at limit.
+- solve_board(board): Returns one solution of a board, or None if it has none.
+- random_filled_board(size, rng): Returns a random, completely filled board.
+"""
+
+from functools import lru_cache
+from math import isqrt
+
+# Candidates a random fill may try per cell before it starts over with a new
+# seeding. Filling time has a long tail, and a fresh start is faster than waiting.
+FILL_NODES_PER_CELL = 8
+
+
+@lru_cache(maxsize=None)
+def _candidates(size):
+    """
+    Lists the constraints covered by every candidate of a board size.
+
+    Parameters:
+    - size (int): The side of the board, e.g. 16.
+
+    Returns:
+    - list: The four constraints covered by each candidate. Candidate
+      index * size + digit - 1 places digit in the cell with that flat index.
+    """
+    box = isqrt(size)
+    cells = size * size
+    rows = []
+    for index in range(cells):
+        row, col = divmod(index, size)
+        box_index = (row // box) * box + col // box
+        for digit in range(size):
+            rows.append((
+                index,                                  # The cell is filled
+                cells + row * size + digit,             # The digit is in the row
+                2 * cells + col * size + digit,         # The digit is in the column
+                3 * cells + box_index * size + digit,   # The digit is in the box
+            ))
+    return rows
+
+
+def _matrix(board):
+    """
+    Builds the exact-cover matrix left after placing the givens of a board. Only
+    the constraints the givens leave uncovered, and the candidates that do not
+    clash with a given, are included.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+
+    Returns:
+    - columns (dict): The candidates covering each open constraint, or None if the
+      givens already conflict.
+    - rows (list): The constraints covered by each candidate.
+    """
+    size = len(board)
+    box = isqrt(size)
+    cells = size * size
+    rows = _candidates(size)
+    row_used = [0] * size
+    col_used = [0] * size
+    box_used = [0] * size
+    for row in range(size):
+        for col in range(size):
+            digit = board[row][col]
+            if digit:
+                bit = 1 << (digit - 1)
+                box_index = (row // box) * box + col // box
+                if (row_used[row] | col_used[col] | box_used[box_index]) & bit:
+                    return None, rows
+                row_used[row] |= bit
+                col_used[col] |= bit
+                box_used[box_index] |= bit
+
+    columns = {}
+    for unit in range(size):
+        for digit in range(size):
+            bit = 1 << digit
+            if not row_used[unit] & bit:
+                columns[cells + unit * size + digit] = set()
+            if not col_used[unit] & bit:
+                columns[2 * cells + unit * size + digit] = set()
+            if not box_used[unit] & bit:
+                columns[3 * cells + unit * size + digit] = set()
+    for row in range(size):
+        for col in range(size):
+            if board[row][col]:
+                continue
+            index = row * size + col
+            columns[index] = set()
+            used = row_used[row] | col_used[col] | box_used[(row // box) * box + col // box]
+            for digit in range(size):
+                if not used & (1 << digit):
+                    candidate = index * size + digit
+                    for constraint in rows[candidate]:
+                        columns[constraint].add(candidate)
+    return columns, rows
+
+
+def _select(columns, rows, candidate):
+    """
+    Adds a candidate to the solution: removes the constraints it covers and every
+    other candidate that covers one of them.
+
+    Returns:
+    - list: The removed constraint sets, for _deselect.
+    """
+    removed = []
+    for constraint in rows[candidate]:
+        for other in columns[constraint]:
+            for other_constraint in rows[other]:
+                if other_constraint != constraint:
+                    columns[other_constraint].remove(other)
+        removed.append(columns.pop(constraint))
+    return removed
+
+
+def _deselect(columns, rows, candidate, removed):
+    """
+    Takes a candidate out of the solution, undoing _select.
+    """
+    for constraint in reversed(rows[candidate]):
+        columns[constraint] = removed.pop()
+        for other in columns[constraint]:
+            for other_constraint in rows[other]:
+                if other_constraint != constraint:
+                    columns[other_constraint].add(other)
+
+
+def _branches(columns, rng):
+    """
+    Returns the candidates covering the constraint with the fewest candidates, in
+    the order they should be tried (popped from the end).
+    """
+    constraint = min(columns, key=lambda constraint: len(columns[constraint]))
+    candidates = list(columns[constraint])
+    if rng is not None:
+        rng.shuffle(candidates)
+    else:
+        candidates.sort(reverse=True)
+    return candidates
+
+
+def _search(board, limit, rng=None, max_nodes=None):
+    """
+    Finds up to limit solutions of a board.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+    - limit (int): The number of solutions after which the search stops.
+    - rng (Random): If given, candidates are tried in a random order.
+    - max_nodes (int): The number of candidates to try before giving up, or None
+      to search until done.
+
+    Returns:
+    - list: The solutions found, each a list with the digit of every cell, or None
+      if the search gave up.
+    """
+    size = len(board)
+    columns, rows = _matrix(board)
+    if columns is None:
+        return []
+    cells = [digit for row in board for digit in row]
+
+    solutions = []
+    if not columns:
+        return [cells]
+    chosen = []
+    removed = []
+    stack = [_branches(columns, rng)]
+    while stack:
+        if len(chosen) == len(stack):
+            # Undo the candidate tried at this level before trying the next one
+            _deselect(columns, rows, chosen.pop(), removed.pop())
+        branches = stack[-1]
+        if not branches:
+            stack.pop()
+            continue
+        candidate = branches.pop()
+        if max_nodes is not None:
+            max_nodes -= 1
+            if max_nodes < 0:
+                return None
+        removed.append(_select(columns, rows, candidate))
+        chosen.append(candidate)
+        if not columns:
+            solution = cells[:]
+            for found in chosen:
+                solution[found // size] = found % size + 1
+            solutions.append(solution)
+            if len(solutions) >= limit:
+                break
+            continue
+        stack.append(_branches(columns, rng))
+    return solutions
+
+
+def _to_rows(cells, size):
+    """
+    Splits a flat list of digits into rows.
+    """
+    return [cells[row * size:row * size + size] for row in range(size)]
+
+
+def find_solutions(board, limit=2, max_nodes=None):
+    """
+    Finds the solutions of a board, stopping as soon as limit solutions are found.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+    - limit (int): The maximum number of solutions to look for.
+    - max_nodes (int): The number of candidates to try before giving up, or None
+      to search until done.
+
+    Returns:
+    - list: The solved boards found, at most limit of them, or None if the search
+      gave up.
+    """
+    solutions = _search(board, limit, max_nodes=max_nodes)
+    if solutions is None:
+        return None
+    return [_to_rows(cells, len(board)) for cells in solutions]
+
+
+def count_solutions(board, limit=2, max_nodes=None):
+    """
+    Counts the solutions of a board, stopping as soon as limit solutions are found.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+    - limit (int): The maximum number of solutions to look for.
+    - max_nodes (int): The number of candidates to try before giving up, or None
+      to search until done.
+
+    Returns:
+    - int: The number of solutions found, capped at limit, or None if the search
+      gave up.
+    """
+    solutions = _search(board, limit, max_nodes=max_nodes)
+    return None if solutions is None else len(solutions)
+
+
+def solve_board(board):
+    """
+    Solves a board.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+
+    Returns:
+    - list: The solved board, or None if the board has no solution.
+    """
+    solutions = find_solutions(board, 1)
+    return solutions[0] if solutions else None
+
+
+def random_filled_board(size, rng):
+    """
+    Builds a random, completely filled board.
+
+    Parameters:
+    - size (int): The side of the board, e.g. 16.
+    - rng (Random): The random number generator to draw from.
+
+    Returns:
+    - list: A solved board.
+    """
+    box = isqrt(size)
+    while True:
+        board = [[0] * size for _ in range(size)]
+        # The diagonal boxes do not constrain each other, so seed them directly
+        for start in range(0, size, box):
+            digits = list(range(1, size + 1))
+            rng.shuffle(digits)
+            for offset, digit in enumerate(digits):
+                board[start + offset // box][start + offset % box] = digit
+        solutions = _search(board, 1, rng, FILL_NODES_PER_CELL * size * size)
+        if solutions:
+            return _to_rows(solutions[0], size)
+        # Some seedings of a 4x4 board cannot be completed, and a slow fill is
+        # given up, so draw again
@@ -0,0 +1,46 @@
+"""
+frame_pacer.py
+
+This file defines the FramePacer class, which decides how the game loops wait for
+events. While something is animating the loop runs at a capped frame rate; otherwise
+it blocks until an event arrives, so an idle game uses almost no CPU.
+
+Class:
+- FramePacer: Collects the events for one iteration of a game loop.
+"""
+
+import pygame
+
+DEFAULT_FPS = 60
+IDLE_TIMEOUT_MS = 500  # Wake up periodically even when idle, e.g. for timers
+
+class FramePacer:
+    """
+    Collects the events for one iteration of a game loop.
+
+    Attributes:
+    - fps (int): The frame rate cap while animating.
+    - idle_timeout (int): The longest time in milliseconds to block while idle.
+    - animating (bool): Whether something on screen is animating.
+    """
+    def __init__(self, fps=DEFAULT_FPS, idle_timeout=IDLE_TIMEOUT_MS):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.animating = False
+        self.clock = pygame.time.Clock()
+
+    def events(self):
+        """
+        Waits for the next frame or event and returns the pending events.
+
+        Returns:
+        - list: The events to handle in this iteration, possibly empty.
+        """
+        if self.animating:
+            self.clock.tick(self.fps)
+            return pygame.event.get()
+
+        event = pygame.event.wait(self.idle_timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        return events
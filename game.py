@@ -1,112 +1,308 @@
 """
 game.py
 
-This file serves as the entry point for the Sudoku game. It initializes the game,
-sets up the display, and contains the main game loop. It handles user inputs and
-updates the game state accordingly.
+This file serves as the entry point for the Sudoku game. It is the pygame front end
+over the game logic in board.py: it sets up the display when main() runs, contains
+the main game loop, and turns user inputs into moves on the board. Importing it
+has no side effects.
+
+The window is resized to fit the board of each game, 4x4 to 25x25, and back to
+its usual size for the home screen.
+
+F3 toggles a performance overlay, and F4 starts and stops a profile capture of
+the game loop, written to the profiles folder next to the save file. With
+--record DIR, the input of every game is recorded for replay (see recording.py).
 
 Functions:
-- main(): The main function that runs the game loop.
+- init_display(): Initializes pygame and opens the game window.
+- main(argv): The main function that shows the home screen and starts games.
+- wait_for_puzzle(pool, window): Takes a puzzle from a pool while keeping the window responsive.
+- run_game(cells, solution, pacer, debug_overlay, profiler, recorder, resumed): Runs the game loop for a single puzzle.
 """
 
+import argparse
 import pygame
 import sys
-from sudoku_generator import create_sudoku_grid, initialize_grid
-from events import handle_mouse_click, handle_key_press, handle_tab_key
-from utils import draw_grid, draw_cells
+import time
+from sudoku_generator import initialize_grid, load_saved_grid
+from journal import save_game_async
+from puzzle_pool import PuzzlePool
+from events import handle_board_event
+from renderer import BoardRenderer, board_pixels
+from frame_pacer import FramePacer
 from home_screen import home_screen
-from tkinter import Tk, messagebox
+from overlay import confirm_dialog, info_dialog, notice_dialog
+from debug_overlay import DebugOverlay
+from profiling import LoopProfiler
+from recording import InputRecorder
 import os
 
 # Constants
 WINDOW_SIZE = 450
 WHITE = (255, 255, 255)
+CAPTION = "Sudoku by Anurag using ChatGPT 💗"
+SAVE_PATH = os.path.join(os.path.expanduser("~"), ".sudoku_game", "save.bin")
+PROFILE_DIR = os.path.join(os.path.dirname(SAVE_PATH), "profiles")
+LARGE_POOL_DEPTH = 1  # Boards above 9x9 are slower to generate and seldom played
+WAIT_STEP = 0.05  # Seconds between checks for events while a puzzle is generated
 
 # Get the base path of the executable
 base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
 
-# Initialize Pygame
-pygame.init()
+def init_display():
+    """
+    Initializes pygame, opens the game window and sets its icon and caption.
+
+    Returns:
+    - Surface: The display surface.
+    """
+    pygame.init()
+
+    # Load and set the window icon
+    icon_path = os.path.join(base_path, 'assets', 'icon.png')
+    icon = pygame.image.load(icon_path)
+    pygame.display.set_icon(icon)
+
+    window = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+    pygame.display.set_caption(CAPTION)
+    return window
+
+def main(argv=None):
+    """
+    The main function that shows the home screen and starts a new game every time
+    the player chooses to play. Puzzles are generated in the background while the
+    player is on the home screen or in a game; the pool of a board size other than
+    9x9 is started the first time that size is played, and the window shows that
+    the puzzle is being generated until it is ready.
+
+    With --record DIR, the input of every game is recorded to a new file in DIR,
+    to be replayed with recording.py.
+
+    Parameters:
+    - argv (list): The command-line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Play Sudoku.")
+    parser.add_argument("--record", metavar="DIR", help="record the input of every game to a file in DIR")
+    args = parser.parse_args(argv)
+
+    window = init_display()
+    pools = {9: PuzzlePool()}
+    pools[9].start()
+    size = 9
+    pacer = FramePacer()
+    debug_overlay = DebugOverlay()
+    profiler = LoopProfiler(PROFILE_DIR)
+    saver = None
+
+    def start_pool(size):
+        # Larger boards are slower to generate and seldom played, so their pools
+        # only start once they are
+        if size not in pools:
+            pools[size] = PuzzlePool(LARGE_POOL_DEPTH, size=size)
+            pools[size].start()
+
+    try:
+        while True:
+            # Show the home screen
+            if window.get_size() != (WINDOW_SIZE, WINDOW_SIZE):
+                window = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+            choice, size = home_screen(pacer, can_continue=saver is not None or os.path.exists(SAVE_PATH), size=size)
+            if saver:
+                saver.join()  # Make sure the last save has reached the disk
+                saver = None
+            if choice == "continue":
+                try:
+                    cells, solution = load_saved_grid(SAVE_PATH)
+                except ValueError:
+                    # A damaged save cannot be resumed, so drop it and go back home
+                    os.remove(SAVE_PATH)
+                    continue
+                debug_overlay.generation_time = None
+            elif choice == "play":
+                # Take a new puzzle every time we enter the game loop
+                start_pool(size)
+                pool = pools[size]
+                puzzle = wait_for_puzzle(pool, window)
+                if puzzle is None:
+                    continue  # The player went back to the home screen
+                cells, solution = puzzle
+                debug_overlay.generation_time = pool.last_generation_time
+            else:
+                return
+            recorder = None
+            if args.record:
+                name = time.strftime("session-%Y%m%d-%H%M%S.rec")
+                recorder = InputRecorder(os.path.join(args.record, name), cells)
+            saver = run_game(cells, solution, pacer, debug_overlay, profiler, recorder, resumed=choice == "continue")
+            window = pygame.display.get_surface()
+    finally:
+        for pool in pools.values():
+            pool.stop()
 
-# Load and set the window icon
-icon_path = os.path.join(base_path, 'assets', 'icon.png')
-icon = pygame.image.load(icon_path)
-pygame.display.set_icon(icon)
+def wait_for_puzzle(pool, window):
+    """
+    Takes a puzzle from a pool. If none is ready, a notice is shown over the home
+    screen and events are still handled until the pool has one, so the window can
+    be closed, or Escape pressed to go back, during a long generation.
 
-# Set up the display
-window = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
-pygame.display.set_caption("Sudoku by Anurag using ChatGPT 💗")
+    Parameters:
+    - pool (PuzzlePool): The pool of the board size to play.
+    - window (Surface): The display surface.
 
-# Initialize Tkinter (used for messagebox)
-root = Tk()
-root.withdraw()  # Hide the root window
+    Returns:
+    - cells: The board for the Sudoku puzzle, indexable as a grid of cells.
+    - solution: The solution for the Sudoku puzzle.
+    Or None if the player pressed Escape before the puzzle was ready.
+    """
+    puzzle = pool.get(timeout=WAIT_STEP)
+    if puzzle is not None:
+        return puzzle
+    notice = notice_dialog("Generating...", f"Preparing a {pool.size}x{pool.size} puzzle. Press Escape to go back.")
+    notice.show(window)
+    while puzzle is None:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                notice.close(window)
+                return None
+            notice.handle_event(event, window)
+        puzzle = pool.get(timeout=WAIT_STEP)
+    notice.close(window)
+    return puzzle
 
-def main():
+def run_game(cells, solution, pacer, debug_overlay=None, profiler=None, recorder=None, resumed=False):
     """
-    The main function that initializes the game, sets up the grid, and runs the
-    game loop. It handles user inputs and updates the display.
+    Runs the game loop for a single puzzle until the player completes it or
+    returns to the home screen. It handles user inputs and updates the display.
+    An unfinished game is saved when the player leaves it. Completing a game that
+    was resumed from the save removes the save; completing any other game leaves
+    it, since it belongs to another puzzle. While a dialog is open, events go to
+    the dialog and the board is left as it is.
+
+    Parameters:
+    - cells (list): The cells of the Sudoku puzzle.
+    - solution (list): The solution to the Sudoku puzzle.
+    - pacer (FramePacer): Decides how long to wait for events between frames.
+    - debug_overlay (DebugOverlay): The performance overlay toggled with F3.
+    - profiler (LoopProfiler): The profiler toggled with F4.
+    - recorder (InputRecorder): If given, records the key presses and clicks that
+      reach the board, and saves the recording when the game ends.
+    - resumed (bool): Whether the game was resumed from the save file.
+
+    Returns:
+    - Thread: The thread writing the save file, or None if the game was completed.
     """
-    while True:
-        # Show the home screen
-        if home_screen() != "play":
-            return
-
-        # Generate a new puzzle every time we enter the game loop
-        cells, solution = create_sudoku_grid()
-        initialize_grid(cells)
-        selected_cell = None
-        click_count = 0
-        last_click_time = 0
-
-        # Main loop
-        game_running = True
-        while game_running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    pos = pygame.mouse.get_pos()
-                    current_time = pygame.time.get_ticks()
-                    if current_time - last_click_time < 500:  # Double click detected within 500 ms
-                        click_count += 1
+    initialize_grid(cells)
+    window = pygame.display.get_surface()
+    pixels = board_pixels(cells.size)
+    if window.get_size() != (pixels, pixels):
+        window = pygame.display.set_mode((pixels, pixels))
+    if debug_overlay is None:
+        debug_overlay = DebugOverlay()
+    if profiler is None:
+        profiler = LoopProfiler(PROFILE_DIR)
+    pacer.animating = debug_overlay.enabled  # Keep the overlay figures live
+    saver = None
+    renderer = BoardRenderer(pixels, cells.size)
+    selected_cell = None
+    click_count = 0
+    last_click_time = 0
+    quit_dialog = confirm_dialog("Quit", "Do you want to quit the game?")
+    win_dialog = info_dialog("Congratulations!", "You have completed the Sudoku puzzle!")
+    dialog = None
+
+    # Main loop
+    game_running = True
+    while game_running:
+        result = None
+        events = pacer.events()
+        if debug_overlay.enabled:
+            debug_overlay.start_frame()
+        for event in events:
+            if event.type == pygame.QUIT:
+                if profiler.enabled:
+                    profiler.stop()
+                if recorder:
+                    recorder.save()
+                if not cells.is_complete():
+                    save_game_async(SAVE_PATH, cells).join()
+                pygame.quit()
+                sys.exit()
+            elif dialog:
+                choice = dialog.handle_event(event, window)
+                if choice is None:
+                    continue
+                dialog.close(window)
+                if dialog is quit_dialog and choice == "yes":
+                    saver = save_game_async(SAVE_PATH, cells)
+                    game_running = False  # Exit to home screen
+                elif dialog is win_dialog:
+                    game_running = False
+                dialog = None
+                if not game_running:
+                    break
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                current_time = pygame.time.get_ticks()
+                if current_time - last_click_time < 500:  # Double click detected within 500 ms
+                    click_count += 1
+                else:
+                    click_count = 1
+                last_click_time = current_time
+
+                if recorder:
+                    recorder.record(event, click_count)
+                selected_cell, result, _ = handle_board_event(cells, solution, selected_cell, event, click_count)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    pacer.animating = debug_overlay.toggle(window)
+                elif event.key == pygame.K_F4:
+                    profile_path = profiler.toggle()
+                    if profile_path:
+                        pygame.display.set_caption(f"{CAPTION} - Profile saved to {profile_path}")
                     else:
-                        click_count = 1
-                    last_click_time = current_time
-
-                    cell_pos = handle_mouse_click(pos, cells, click_count)
-                    if cell_pos:
-                        if selected_cell:
-                            selected_cell.set_selected(False)
-                        row, col = cell_pos
-                        selected_cell = cells[row][col] if cells[row][col].active else None
-                        if selected_cell:
-                            selected_cell.set_selected(True)
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_TAB:
-                        if selected_cell:
-                            selected_cell.set_selected(False)
-                        selected_cell = handle_tab_key(cells, selected_cell, event)
-                    elif event.key == pygame.K_ESCAPE:
-                        # Show quit confirmation pop-up
-                        if messagebox.askyesno("Quit", "Do you want to quit the game?"):
-                            game_running = False  # Exit to home screen
-                    elif selected_cell:
-                        result = handle_key_press(selected_cell, cells, selected_cell.row, selected_cell.col, event.key, solution)
-                        if result == "home_screen":
-                            game_running = False
-
-            # Fill the background
-            window.fill(WHITE)
-
-            # Draw the cells
-            draw_cells(window, cells)
-
-            # Draw the grid
-            draw_grid(window)
-
-            # Update the display
-            pygame.display.flip()
+                        pygame.display.set_caption(f"{CAPTION} - Profiling, press F4 to stop")
+                elif event.key == pygame.K_ESCAPE:
+                    # Show quit confirmation dialog over the board
+                    renderer.render(window, cells)
+                    dialog = quit_dialog
+                    dialog.show(window)
+                else:
+                    if recorder:
+                        recorder.record(event)
+                    selected_cell, result, hint = handle_board_event(cells, solution, selected_cell, event)
+                    if hint:
+                        pygame.display.set_caption(f"{CAPTION} - Hint: {hint.message}")
+
+            if result == "home_screen":
+                # Show the final move before congratulating the player
+                renderer.render(window, cells)
+                if resumed and os.path.exists(SAVE_PATH):
+                    os.remove(SAVE_PATH)
+                dialog = win_dialog
+                dialog.show(window)
+                result = None
+
+        # Draw the changed cells and update the display
+        if game_running and not dialog:
+            if debug_overlay.enabled:
+                debug_overlay.end_events()
+                debug_overlay.restore(window)
+                renderer.render(window, cells)
+                debug_overlay.end_frame(renderer.blits)
+                debug_overlay.draw(window)
+            else:
+                renderer.render(window, cells)
+
+    if recorder:
+        recorder.save()
+    # Drop any hint or profiler message from the caption
+    pacer.animating = False
+    pygame.display.set_caption(CAPTION)
+    return saver
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,146 @@
+"""
+generate_bank.py
+
+This file is a command-line tool that generates unique Sudoku puzzles across all CPU
+cores and writes them to a puzzle bank file.
+
+Puzzle number i is generated from the seed (seed + i), so the same arguments always
+produce the same bank regardless of the number of workers. Work is split into
+chunks of consecutive seeds, and finished chunks are written to disk in order as
+they arrive.
+
+Puzzles are filed under the --difficulty level, or under their rated difficulty
+level when --rate is given. With --unique, a puzzle equivalent to one already in
+the bank (the same up to relabeling, row and column swaps and transposition) is
+skipped, so the bank may end up with fewer than --count puzzles. The hashes of the
+puzzles written so far are kept in a temporary SQLite database on disk rather than
+in memory, so deduplicating millions of puzzles does not grow the process.
+
+Usage:
+    python generate_bank.py OUTPUT --count 100000 [--clues 41] [--workers N]
+                            [--seed 0] [--chunk-size 500] [--difficulty 0] [--rate]
+                            [--unique]
+
+Functions:
+- generate_chunk(task): Generates the packed records for one chunk of seeds.
+- iter_tasks(seed, count, chunk_size, clues, difficulty, unique): Splits the seed range into chunks.
+- open_key_store(): Opens a temporary on-disk set of canonical hashes.
+- main(argv): Parses the arguments and writes the bank.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import time
+from canonical import puzzle_hash
+from puzzle_bank import PuzzleBankWriter, pack_record
+from rating import rate_puzzle
+from sudoku_generator import DEFAULT_CLUES, generate_puzzle
+
+def generate_chunk(task):
+    """
+    Generates the packed records for one chunk of seeds.
+
+    Parameters:
+    - task (tuple): The first seed, the number of puzzles, the target clue count,
+      the difficulty level, or None to file each puzzle under its rating, and
+      whether to hash each puzzle for deduplication.
+
+    Returns:
+    - list: The difficulty level, packed record and canonical hash (None unless
+      hashing) of each puzzle, in seed order.
+    """
+    first_seed, count, clues, difficulty, unique = task
+    records = []
+    for seed in range(first_seed, first_seed + count):
+        puzzle, solution = generate_puzzle(clues, random.Random(seed))
+        level = rate_puzzle(puzzle).level if difficulty is None else difficulty
+        key = puzzle_hash(puzzle) if unique else None
+        records.append((level, pack_record(puzzle, solution), key))
+    return records
+
+def iter_tasks(seed, count, chunk_size, clues, difficulty, unique=False):
+    """
+    Splits the seed range into chunks.
+
+    Parameters:
+    - seed (int): The first seed.
+    - count (int): The total number of puzzles.
+    - chunk_size (int): The number of puzzles per chunk.
+    - clues (int): The target clue count.
+    - difficulty (int): The difficulty level, or None to rate each puzzle.
+    - unique (bool): Whether to hash each puzzle for deduplication.
+
+    Yields:
+    - tuple: The task for generate_chunk.
+    """
+    for start in range(0, count, chunk_size):
+        yield seed + start, min(chunk_size, count - start), clues, difficulty, unique
+
+def open_key_store():
+    """
+    Opens a temporary on-disk set of canonical hashes. SQLite deletes the file when
+    the connection is closed.
+
+    Returns:
+    - Connection: The database, with an empty table of keys.
+    """
+    store = sqlite3.connect("")
+    store.execute("CREATE TABLE seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+    return store
+
+def main(argv=None):
+    """
+    Parses the command-line arguments, generates the puzzles and writes the bank.
+
+    Parameters:
+    - argv (list): The command-line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Generate a bank of unique Sudoku puzzles.")
+    parser.add_argument("output", help="path of the puzzle bank file to write")
+    parser.add_argument("--count", type=int, required=True, help="number of puzzles to generate")
+    parser.add_argument("--clues", type=int, default=DEFAULT_CLUES, help="target number of givens per puzzle")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first puzzle")
+    parser.add_argument("--chunk-size", type=int, default=500, help="puzzles per work unit")
+    parser.add_argument("--difficulty", type=int, default=0, help="difficulty level to file the puzzles under")
+    parser.add_argument("--rate", action="store_true", help="file each puzzle under its rated difficulty level")
+    parser.add_argument("--unique", action="store_true", help="skip puzzles equivalent to one already written")
+    args = parser.parse_args(argv)
+
+    difficulty = None if args.rate else args.difficulty
+    tasks = iter_tasks(args.seed, args.count, args.chunk_size, args.clues, difficulty, args.unique)
+    written = 0
+    generated = 0
+    seen = open_key_store() if args.unique else None
+    start_time = time.perf_counter()
+    try:
+        with PuzzleBankWriter(args.output) as writer, multiprocessing.Pool(args.workers) as pool:
+            for records in pool.imap(generate_chunk, tasks):
+                for level, record, key in records:
+                    if key is not None:
+                        inserted = seen.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (bytes.fromhex(key),))
+                        if not inserted.rowcount:
+                            continue
+                    writer.add_record(record, level)
+                    written += 1
+                if seen is not None:
+                    seen.commit()
+                generated += len(records)
+                elapsed = time.perf_counter() - start_time
+                print(f"\r{generated}/{args.count} puzzles, {generated / elapsed:.0f} puzzles/s", end="",
+                      file=sys.stderr)
+    finally:
+        if seen is not None:
+            seen.close()
+
+    elapsed = time.perf_counter() - start_time
+    skipped = f", {generated - written} duplicates skipped" if args.unique else ""
+    print(f"\nWrote {written} puzzles to {args.output} in {elapsed:.1f}s "
+          f"({generated / elapsed:.0f} puzzles/s with {args.workers} workers{skipped})", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
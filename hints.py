@@ -0,0 +1,133 @@
+"""
+hints.py
+
+This file contains the hint engine. It finds the next logically deducible cell from
+the board's live digit masks, so no solver search is needed: first a cell holding a
+wrong digit, then a naked or hidden single, then a single revealed by the rating
+engine's elimination techniques. The known solution is only used as a fallback.
+The rating techniques are written for 9x9 boards, so other sizes go straight from
+singles to the fallback.
+
+Functions:
+- find_hint(board): Finds the next cell to fill and explains why.
+"""
+
+from collections import namedtuple
+from cell import digit_symbol
+from rating import TECHNIQUES
+
+# Everything on the rating ladder after the two singles only removes candidates
+ELIMINATIONS = TECHNIQUES[2:]
+
+Hint = namedtuple("Hint", ["index", "digit", "technique", "message"])
+
+
+def _position(index, size):
+    """
+    Describes the position of a cell for the player.
+    """
+    row, col = divmod(index, size)
+    return f"row {row + 1}, column {col + 1}"
+
+
+def _popcount(mask):
+    """
+    Counts the digits in a candidate mask.
+    """
+    return bin(mask).count("1")
+
+
+def _find_single(digits, candidates, tables):
+    """
+    Finds a naked or hidden single.
+
+    Parameters:
+    - digits (list): The digit of each cell, 0 if empty.
+    - candidates (list): The candidates of each cell, one bit per digit.
+    - tables (Tables): The index tables of the board size.
+
+    Returns:
+    - tuple: The index, digit, technique and message, or None if there is no single.
+    """
+    size = tables.size
+    for index in range(tables.cells):
+        mask = candidates[index]
+        if not digits[index] and mask and not mask & (mask - 1):
+            digit = mask.bit_length()
+            return (index, digit, "Naked single",
+                    f"{digit_symbol(digit)} is the only number that fits at {_position(index, size)}")
+
+    for kind, units in (("row", tables.row_units), ("column", tables.col_units), ("box", tables.box_units)):
+        for unit in units:
+            once = 0
+            twice = 0
+            for index in unit:
+                twice |= once & candidates[index]
+                once |= candidates[index]
+            hidden = once & ~twice
+            if hidden:
+                bit = hidden & -hidden
+                for index in unit:
+                    if candidates[index] & bit:
+                        digit = bit.bit_length()
+                        return (index, digit, "Hidden single",
+                                f"{digit_symbol(digit)} can only go at {_position(index, size)} in its {kind}")
+    return None
+
+
+def find_hint(board):
+    """
+    Finds the next cell to fill and explains why.
+
+    Parameters:
+    - board (Board): The board to look at.
+
+    Returns:
+    - Hint: The flat index and digit to fill (0 to clear a wrong digit), the
+      technique and a message for the player, or None if the board is complete.
+    """
+    digits = board.digits
+    solution = board.solution
+    tables = board.tables
+    size = board.size
+
+    # Candidates are meaningless around a wrong digit, so point those out first
+    for index in board.editable:
+        digit = digits[index]
+        if digit and digit != solution[index]:
+            # Clear it rather than fill in the answer, which may still sit wrongly in a peer
+            return Hint(index, 0, "Mistake", f"The {digit_symbol(digit)} at {_position(index, size)} is wrong")
+
+    all_digits = (1 << size) - 1
+    rows, cols, boxes = board.rows, board.cols, board.boxes
+    row_of, col_of, box_of = tables.row_of, tables.col_of, tables.box_of
+    candidates = [
+        0 if digits[index] else all_digits & ~(rows[row_of[index]] | cols[col_of[index]] | boxes[box_of[index]])
+        for index in range(tables.cells)
+    ]
+    single = _find_single(digits, candidates, tables)
+    if single:
+        return Hint(*single)
+
+    # Apply eliminations, easiest first, until one of them reveals a single
+    scratch = list(digits)
+    hardest = None
+    while size == 9:
+        for name, technique, _ in ELIMINATIONS:
+            if technique(scratch, candidates):
+                hardest = name
+                break
+        else:
+            break
+        single = _find_single(scratch, candidates, tables)
+        if single:
+            index, digit, _, message = single
+            return Hint(index, digit, hardest, f"After {hardest.lower()}, {message}")
+
+    # Fall back to the solution for the most constrained empty cell
+    empty = [index for index in board.editable if not digits[index]]
+    if not empty:
+        return None
+    index = min(empty, key=lambda index: _popcount(candidates[index]))
+    answer = digit_symbol(solution[index])
+    return Hint(index, solution[index], "Solution", f"The answer at {_position(index, size)} is {answer}")
@@ -2,12 +2,16 @@
 home_screen.py
 
 This file handles the home screen of the Sudoku game, featuring an image, title,
-and buttons to start the game or exit.
+and buttons to start the game, continue a saved game, choose the board size, or
+exit. The image and fonts are loaded the first time the home screen is drawn,
+after the display is set up.
 """
 
 import pygame
 import sys
 import os
+from frame_pacer import FramePacer
+from tables import SIZES
 
 # Constants
 WINDOW_SIZE = 450
@@ -25,92 +29,199 @@ SHADOW_OFFSET = 2
 # Get the base path of the executable
 base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
 
-# Initialize Pygame
-pygame.init()
-
-# Load the home screen image
-home_screen_image_path = os.path.join(base_path, 'assets', 'home_screen_image.png')
-home_screen_image = pygame.image.load(home_screen_image_path)
-
-# Load the custom font
-font_path = os.path.join(base_path, 'assets', 'BebasNeue-Regular.ttf')
+# Home screen image and fonts, loaded on first use
+home_screen_image = None
+title_font = None
+button_font = None
 title_font_size = 80
 button_font_size = 32
-title_font = pygame.font.Font(font_path, title_font_size)
-button_font = pygame.font.Font(font_path, button_font_size)
-
-# Set up the display
-window = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
-pygame.display.set_caption("Sudoku Game")
 
 # Define buttons
-play_button_rect = pygame.Rect((WINDOW_SIZE // 2 - BUTTON_WIDTH // 2, 200), (BUTTON_WIDTH, BUTTON_HEIGHT))
-exit_button_rect = pygame.Rect((WINDOW_SIZE // 2 - BUTTON_WIDTH // 2, 300), (BUTTON_WIDTH, BUTTON_HEIGHT))
+play_button_rect = pygame.Rect((WINDOW_SIZE // 2 - BUTTON_WIDTH // 2, 170), (BUTTON_WIDTH, BUTTON_HEIGHT))
+size_button_rect = pygame.Rect((WINDOW_SIZE // 2 - BUTTON_WIDTH // 2, 240), (BUTTON_WIDTH, BUTTON_HEIGHT))
+exit_button_rect = pygame.Rect((WINDOW_SIZE // 2 - BUTTON_WIDTH // 2, 310), (BUTTON_WIDTH, BUTTON_HEIGHT))
+continue_button_rect = pygame.Rect((WINDOW_SIZE // 2 - BUTTON_WIDTH // 2, 145), (BUTTON_WIDTH, BUTTON_HEIGHT))
+
+# The text "Size" stands for the label of the size button, which shows the board size
+BUTTONS = ((play_button_rect, "Play"), (size_button_rect, "Size"), (exit_button_rect, "Exit"))
+
+# Layout used when there is a saved game to continue
+BUTTONS_WITH_CONTINUE = (
+    (continue_button_rect, "Continue"),
+    (play_button_rect.move(0, 45), "Play"),
+    (size_button_rect.move(0, 45), "Size"),
+    (exit_button_rect.move(0, 45), "Exit"),
+)
+
+# Pre-composed background and button variants, built on first use
+_background = None
+_button_surfaces = {}
+
+def load_assets():
+    """
+    Loads the home screen image and the custom font. Pygame must be initialized first.
+    """
+    global home_screen_image, title_font, button_font
+    home_screen_image_path = os.path.join(base_path, 'assets', 'home_screen_image.png')
+    home_screen_image = pygame.image.load(home_screen_image_path)
+
+    font_path = os.path.join(base_path, 'assets', 'BebasNeue-Regular.ttf')
+    title_font = pygame.font.Font(font_path, title_font_size)
+    button_font = pygame.font.Font(font_path, button_font_size)
+
+def size_label(size):
+    """
+    Returns the label of the size button for a board size, e.g. "Size: 9x9".
+    """
+    return f"Size: {size}x{size}"
 
-def draw_button(surface, rect, text, font, color, hover_color):
+def render_button(background, rect, text, font, color):
     """
-    Draws a button with text and handles hover effect.
+    Renders a button with text over its part of the background.
 
     Parameters:
-    - surface (Surface): The surface to draw the button on.
+    - background (Surface): The surface the button is drawn over.
     - rect (Rect): The rectangle defining the button's position and size.
     - text (str): The text to display on the button.
     - font (Font): The font of the button text.
     - color (tuple): The color of the button.
-    - hover_color (tuple): The color of the button when hovered.
+
+    Returns:
+    - Surface: The rendered button, the size of rect.
     """
-    mouse_pos = pygame.mouse.get_pos()
-    button_color = hover_color if rect.collidepoint(mouse_pos) else color
-    pygame.draw.rect(surface, button_color, rect, border_radius=10)
+    surface = background.subsurface(rect).copy()
+    local_rect = surface.get_rect()
+    pygame.draw.rect(surface, color, local_rect, border_radius=10)
     button_text = font.render(text, True, BUTTON_TEXT_COLOR)
-    text_rect = button_text.get_rect(center=rect.center)
+    text_rect = button_text.get_rect(center=local_rect.center)
     surface.blit(button_text, text_rect)
+    return surface
 
-def draw_home_screen():
+def build_home_screen():
     """
-    Draws the home screen with the background image, title, and buttons.
+    Composes the background image and title once, and renders the normal and hover
+    variants of each button over it.
     """
-    window.fill(WHITE)
+    global _background
+    if home_screen_image is None:
+        load_assets()
+    _background = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE))
+    _background.fill(WHITE)
 
     # Scale the background image to fill the screen
     bg_image = pygame.transform.scale(home_screen_image, (WINDOW_SIZE, WINDOW_SIZE))
-    window.blit(bg_image, (0, 0))
+    _background.blit(bg_image, (0, 0))
 
     # Draw title shadow
     title_shadow = title_font.render("Sudoku", True, SHADOW_COLOR)
     title_shadow_rect = title_shadow.get_rect(center=(WINDOW_SIZE // 2 + SHADOW_OFFSET, 100 + SHADOW_OFFSET))
-    window.blit(title_shadow, title_shadow_rect)
+    _background.blit(title_shadow, title_shadow_rect)
 
     # Draw title
     title = title_font.render("Sudoku", True, WHITE)
     title_rect = title.get_rect(center=(WINDOW_SIZE // 2, 100))
-    window.blit(title, title_rect)
+    _background.blit(title, title_rect)
+
+    # Render both variants of each button, and of the size button for every size
+    for rect, text in BUTTONS + BUTTONS_WITH_CONTINUE:
+        labels = [size_label(size) for size in SIZES] if text == "Size" else [text]
+        for label in labels:
+            _button_surfaces[(label, rect.topleft)] = (
+                render_button(_background, rect, label, button_font, BUTTON_COLOR),
+                render_button(_background, rect, label, button_font, BUTTON_HOVER_COLOR),
+            )
+
+def draw_button(surface, rect, text, hovered, size=9):
+    """
+    Draws the pre-rendered variant of a button for its hover state.
+
+    Parameters:
+    - surface (Surface): The surface to draw the button on.
+    - rect (Rect): The rectangle defining the button's position and size.
+    - text (str): The text of the button.
+    - hovered (bool): Whether the mouse is over the button.
+    - size (int): The board size shown by the size button.
+    """
+    label = size_label(size) if text == "Size" else text
+    surface.blit(_button_surfaces[(label, rect.topleft)][hovered], rect)
+
+def draw_home_screen(mouse_pos, buttons=BUTTONS, size=9):
+    """
+    Draws the whole home screen with the background image, title, and buttons.
+
+    Parameters:
+    - mouse_pos (tuple): The mouse position, used for the hover effect.
+    - buttons (tuple): The rect and text of each button to draw.
+    - size (int): The board size shown by the size button.
 
-    # Draw buttons
-    draw_button(window, play_button_rect, "Play", button_font, BUTTON_COLOR, BUTTON_HOVER_COLOR)
-    draw_button(window, exit_button_rect, "Exit", button_font, BUTTON_COLOR, BUTTON_HOVER_COLOR)
+    Returns:
+    - dict: The hover state of each button, keyed by its text.
+    """
+    if _background is None:
+        build_home_screen()
+    window = pygame.display.get_surface()
+    window.blit(_background, (0, 0))
+
+    hovered = {}
+    for rect, text in buttons:
+        hovered[text] = rect.collidepoint(mouse_pos)
+        draw_button(window, rect, text, hovered[text], size)
 
     pygame.display.flip()
+    return hovered
 
-def home_screen():
+def home_screen(pacer=None, can_continue=False, size=9):
     """
-    The home screen function that handles events and updates the display.
+    The home screen function that handles events and updates the display. The size
+    button cycles through the supported board sizes.
+
+    Parameters:
+    - pacer (FramePacer): Decides how long to wait for events between frames.
+    - can_continue (bool): Whether to offer a button to continue a saved game.
+    - size (int): The board size selected when the home screen opens.
+
+    Returns:
+    - str: "play" to start a new game or "continue" to resume the saved one.
+    - int: The selected board size.
     """
-    while True:
-        draw_home_screen()
+    if pacer is None:
+        pacer = FramePacer()
+    buttons = BUTTONS_WITH_CONTINUE if can_continue else BUTTONS
+    hovered = draw_home_screen(pygame.mouse.get_pos(), buttons, size)
+    window = pygame.display.get_surface()
 
-        for event in pygame.event.get():
+    while True:
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                hovered = draw_home_screen(pygame.mouse.get_pos(), buttons, size)
+            elif event.type == pygame.MOUSEMOTION:
+                # Repaint only the buttons whose hover state changed
+                for rect, text in buttons:
+                    is_hovered = rect.collidepoint(event.pos)
+                    if is_hovered != hovered[text]:
+                        hovered[text] = is_hovered
+                        draw_button(window, rect, text, is_hovered, size)
+                        pygame.display.update(rect)
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left mouse button
-                    mouse_pos = event.pos
-                    if play_button_rect.collidepoint(mouse_pos):
-                        return "play"  # Start the game
-                    elif exit_button_rect.collidepoint(mouse_pos):
-                        pygame.quit()
-                        sys.exit()
+                    for rect, text in buttons:
+                        if not rect.collidepoint(event.pos):
+                            continue
+                        if text == "Exit":
+                            pygame.quit()
+                            sys.exit()
+                        if text == "Size":
+                            size = SIZES[(SIZES.index(size) + 1) % len(SIZES)]
+                            draw_button(window, rect, text, True, size)
+                            pygame.display.update(rect)
+                            continue
+                        return text.lower(), size  # Start or continue the game
 
 if __name__ == "__main__":
+    pygame.init()
+    pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+    pygame.display.set_caption("Sudoku Game")
     home_screen()
@@ -0,0 +1,269 @@
+"""
+journal.py
+
+This file defines the move journal and the save file built on it. Every move is
+appended to the journal as two bytes, the cell index and the old and new digit
+packed into one byte, so undo and redo only move a cursor. Boards larger than 9x9
+have more cells and digits than fit in that, and use four-byte entries instead: the
+cell index (u16), the old digit and the new digit. A saved game is the puzzle plus
+its journal, and resuming replays the journal onto a fresh board.
+
+Save file layout (all integers little-endian):
+- Magic b"SDKS", version (u16), journal cursor (u32), journal length in entries (u32).
+- Version 1, used for 9x9 boards: the puzzle as a puzzle bank record (see
+  puzzle_bank.py).
+- Version 2, used for other sizes: the board side (u8), the solution with one byte
+  per cell, and a bit mask of the given cells.
+- The journal entries.
+
+Classes:
+- MoveJournal: An append-only log of moves with an undo/redo cursor.
+
+Functions:
+- encode_game(board): Encodes a board and its journal in the save file format.
+- decode_game(data): Decodes the puzzle and journal from save file contents.
+- save_game(path, board): Writes a board and its journal to a save file.
+- save_game_async(path, board): Writes a save file from a background thread.
+- load_game(path): Reads the puzzle and journal from a save file.
+"""
+
+import os
+import struct
+import threading
+from puzzle_bank import RECORD_SIZE, pack_record, unpack_record
+from tables import SIZES
+
+SAVE_MAGIC = b"SDKS"
+SAVE_VERSION = 1
+SIZED_SAVE_VERSION = 2
+SAVE_HEADER = struct.Struct("<4sHII")
+ENTRY_SIZE = 2
+WIDE_ENTRY = struct.Struct("<HBB")
+
+
+class MoveJournal:
+    """
+    An append-only log of moves with an undo/redo cursor. Making a new move after
+    undoing drops the moves that could have been redone.
+
+    Attributes:
+    - entries (bytearray): Two bytes per move: the cell index, then the old digit
+      in the high nibble and the new digit in the low nibble. Wide journals use
+      four bytes per move: the cell index (u16), the old digit and the new digit.
+    - cursor (int): The number of moves currently applied.
+    - wide (bool): Whether the journal uses four-byte entries, for boards larger
+      than 9x9.
+    """
+    def __init__(self, entries=b"", cursor=None, wide=False):
+        self.wide = wide
+        self.entry_size = WIDE_ENTRY.size if wide else ENTRY_SIZE
+        self.entries = bytearray(entries)
+        self.cursor = len(self.entries) // self.entry_size if cursor is None else cursor
+
+    def __len__(self):
+        return len(self.entries) // self.entry_size
+
+    def _entry(self, offset):
+        """
+        Decodes the entry at a byte offset into the cell index, old digit and new digit.
+        """
+        if self.wide:
+            return WIDE_ENTRY.unpack_from(self.entries, offset)
+        value = self.entries[offset + 1]
+        return self.entries[offset], value >> 4, value & 0x0F
+
+    def record(self, index, old, new):
+        """
+        Appends a move at the cursor.
+
+        Parameters:
+        - index (int): The flat index of the cell.
+        - old (int): The digit before the move.
+        - new (int): The digit after the move.
+        """
+        end = self.cursor * self.entry_size
+        if end < len(self.entries):
+            del self.entries[end:]
+        if self.wide:
+            self.entries += WIDE_ENTRY.pack(index, old, new)
+        else:
+            self.entries.append(index)
+            self.entries.append((old << 4) | new)
+        self.cursor += 1
+
+    def undo(self):
+        """
+        Steps back one move.
+
+        Returns:
+        - tuple: The cell index and the digit to restore, or None if there is
+          nothing to undo.
+        """
+        if self.cursor == 0:
+            return None
+        self.cursor -= 1
+        index, old, _ = self._entry(self.cursor * self.entry_size)
+        return index, old
+
+    def redo(self):
+        """
+        Steps forward one move.
+
+        Returns:
+        - tuple: The cell index and the digit to set again, or None if there is
+          nothing to redo.
+        """
+        if self.cursor * self.entry_size >= len(self.entries):
+            return None
+        index, _, new = self._entry(self.cursor * self.entry_size)
+        self.cursor += 1
+        return index, new
+
+    def replay(self, board):
+        """
+        Applies the moves up to the cursor to a board without recording them again.
+
+        Parameters:
+        - board (Board): The board in its starting position.
+        """
+        for offset in range(0, self.cursor * self.entry_size, self.entry_size):
+            index, _, new = self._entry(offset)
+            board.set_digit(index, new, record=False)
+
+
+def encode_game(board):
+    """
+    Encodes a board and its journal in the save file format.
+
+    Parameters:
+    - board (Board): The board to encode.
+
+    Returns:
+    - bytes: The contents of a save file.
+    """
+    journal = board.journal
+    if board.size == 9:
+        header = SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, journal.cursor, len(journal))
+        return header + pack_record(board.puzzle_rows(), board.solution_rows()) + bytes(journal.entries)
+    header = SAVE_HEADER.pack(SAVE_MAGIC, SIZED_SAVE_VERSION, journal.cursor, len(journal))
+    givens = sum(1 << index for index, given in enumerate(board.givens) if given)
+    return (header + bytes([board.size]) + board.solution
+            + givens.to_bytes((len(board.givens) + 7) // 8, "little") + bytes(journal.entries))
+
+
+def _write(path, data):
+    """
+    Writes a file atomically, so a crash never leaves a half-written save behind.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as save_file:
+        save_file.write(data)
+    os.replace(temp_path, path)
+
+
+def save_game(path, board):
+    """
+    Writes a board and its journal to a save file.
+
+    Parameters:
+    - path (str): The path of the save file.
+    - board (Board): The board to save.
+    """
+    _write(path, encode_game(board))
+
+
+def save_game_async(path, board):
+    """
+    Writes a save file from a background thread. The board is encoded on the
+    calling thread, which only copies a few hundred bytes, and the file is written
+    off the render thread.
+
+    Parameters:
+    - path (str): The path of the save file.
+    - board (Board): The board to save.
+
+    Returns:
+    - Thread: The writer thread, which can be joined to wait for the write.
+    """
+    thread = threading.Thread(target=_write, args=(path, encode_game(board)), name="save-game")
+    thread.start()
+    return thread
+
+
+def load_game(path):
+    """
+    Reads the puzzle and journal from a save file. Replaying the journal onto a
+    board built from the puzzle restores the saved position.
+
+    Parameters:
+    - path (str): The path of the save file.
+
+    Returns:
+    - puzzle (list): The puzzle board, with 0 for empty cells.
+    - solution (list): The solution board.
+    - journal (MoveJournal): The saved journal.
+    """
+    with open(path, "rb") as save_file:
+        data = save_file.read()
+    try:
+        return decode_game(data)
+    except ValueError as error:
+        raise ValueError(f"{path}: {error}") from None
+
+
+def decode_game(data):
+    """
+    Decodes the puzzle and journal from the contents of a save file. Every length
+    and value is checked, so a truncated or corrupt file raises ValueError rather
+    than failing while the game is built from it.
+
+    Parameters:
+    - data (bytes): The contents of a save file.
+
+    Returns:
+    - puzzle (list): The puzzle board, with 0 for empty cells.
+    - solution (list): The solution board.
+    - journal (MoveJournal): The saved journal.
+    """
+    if len(data) < SAVE_HEADER.size:
+        raise ValueError("Save file is truncated")
+    magic, version, cursor, length = SAVE_HEADER.unpack_from(data, 0)
+    offset = SAVE_HEADER.size
+    if magic != SAVE_MAGIC or version not in (SAVE_VERSION, SIZED_SAVE_VERSION):
+        raise ValueError("Not a supported save file")
+    if version == SAVE_VERSION:
+        if len(data) < offset + RECORD_SIZE:
+            raise ValueError("Save file is truncated")
+        size = 9
+        puzzle, solution = unpack_record(data[offset:offset + RECORD_SIZE])
+        offset += RECORD_SIZE
+    else:
+        if len(data) < offset + 1 or data[offset] not in SIZES:
+            raise ValueError("Save file has an unsupported board size")
+        size = data[offset]
+        cells = size * size
+        offset += 1
+        mask_size = (cells + 7) // 8
+        if len(data) < offset + cells + mask_size:
+            raise ValueError("Save file is truncated")
+        digits = data[offset:offset + cells]
+        offset += cells
+        givens = int.from_bytes(data[offset:offset + mask_size], "little")
+        offset += mask_size
+        solution = [list(digits[row * size:row * size + size]) for row in range(size)]
+        puzzle = [[digits[index] if givens >> index & 1 else 0 for index in range(row * size, row * size + size)]
+                  for row in range(size)]
+    if any(not 1 <= digit <= size for row in solution for digit in row):
+        raise ValueError("Save file has an invalid solution")
+
+    wide = size > 9
+    entry_size = WIDE_ENTRY.size if wide else ENTRY_SIZE
+    if cursor > length or len(data) < offset + length * entry_size:
+        raise ValueError("Save file journal is truncated")
+    journal = MoveJournal(data[offset:offset + length * entry_size], cursor, wide)
+    for entry in range(length):
+        index, old, new = journal._entry(entry * entry_size)
+        if index >= size * size or old > size or new > size:
+            raise ValueError("Save file journal has an invalid move")
+    return puzzle, solution, journal
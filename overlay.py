@@ -0,0 +1,278 @@
+"""
+overlay.py
+
+This file defines the modal dialogs of the game, drawn with pygame as a layer over
+the board. A dialog does not block: the game loop keeps running and passes its
+events to the open dialog until one of the buttons is chosen.
+
+When a dialog is shown, the board on the display surface is kept as its backdrop,
+dimmed, and the dialog panel is drawn over it. Closing the dialog puts the backdrop
+back, so the board does not have to be redrawn. The panel narrows to fit small
+windows, such as the one of a 4x4 board, and its text is wrapped to match.
+
+Class:
+- Dialog: A modal dialog with a title, a message and any number of buttons.
+
+Functions:
+- confirm_dialog(title, message): Creates a dialog with Yes and No buttons.
+- info_dialog(title, message): Creates a dialog with an OK button.
+- notice_dialog(title, message): Creates a dialog without buttons.
+"""
+
+import pygame
+
+# Constants
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+DIM_COLOR = (0, 0, 0, 120)  # Translucent black over the board
+PANEL_COLOR = WHITE
+BUTTON_COLOR = BLACK
+BUTTON_HOVER_COLOR = (70, 70, 70)  # Slightly lighter black for hover effect
+BUTTON_TEXT_COLOR = WHITE
+PANEL_WIDTH = 340  # Widest the panel gets
+PANEL_MARGIN = 10  # Least space kept between the panel and the window edges
+PANEL_PADDING = 20
+BUTTON_WIDTH = 100
+BUTTON_HEIGHT = 40
+BUTTON_SPACING = 20
+TITLE_FONT_SIZE = 36
+TEXT_FONT_SIZE = 26
+
+_fonts = {}
+
+def _font(size):
+    """
+    Returns the default font at a size, loading it on first use.
+    """
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.SysFont(None, size)
+    return font
+
+def _wrap(text, font, width):
+    """
+    Splits text into lines that fit within width pixels.
+    """
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if line and font.size(candidate)[0] > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+class Dialog:
+    """
+    A modal dialog with a title, a message and any number of buttons.
+
+    The first button is chosen with Enter and the last one with Escape. A dialog
+    whose buttons are Yes and No also answers to the Y and N keys. A dialog
+    without buttons is a notice: it is never answered, only closed by its owner.
+
+    Attributes:
+    - title (str): The title of the dialog.
+    - message (str): The message of the dialog.
+    - buttons (tuple): The text of each button, from left to right.
+    """
+    def __init__(self, title, message, buttons):
+        self.title = title
+        self.message = message
+        self.buttons = buttons
+        self._backdrop = None
+        self._dimmed = None
+        self._panel = None
+        self._panel_rect = None
+        self._layout_size = None
+        self._button_rects = []
+        self._button_surfaces = {}
+        self._hovered = None
+
+    @property
+    def is_open(self):
+        """Whether the dialog is currently shown."""
+        return self._backdrop is not None
+
+    def _layout(self, size):
+        """
+        Renders the panel and the button variants, centered in a surface of the given size.
+        """
+        title_font = _font(TITLE_FONT_SIZE)
+        text_font = _font(TEXT_FONT_SIZE)
+        panel_width = min(PANEL_WIDTH, size[0] - 2 * PANEL_MARGIN)
+        text_width = panel_width - 2 * PANEL_PADDING
+        title_lines = _wrap(self.title, title_font, text_width)
+        lines = _wrap(self.message, text_font, text_width)
+        line_height = text_font.get_linesize()
+        height = (PANEL_PADDING + len(title_lines) * title_font.get_linesize() + PANEL_PADDING // 2
+                  + len(lines) * line_height + PANEL_PADDING)
+        if self.buttons:
+            height += BUTTON_HEIGHT + PANEL_PADDING
+
+        self._layout_size = size
+        self._panel_rect = pygame.Rect(0, 0, panel_width, height)
+        self._panel_rect.center = (size[0] // 2, size[1] // 2)
+        self._panel = pygame.Surface(self._panel_rect.size, pygame.SRCALPHA)
+        pygame.draw.rect(self._panel, PANEL_COLOR, self._panel.get_rect(), border_radius=10)
+
+        y = PANEL_PADDING
+        for line in title_lines:
+            title = title_font.render(line, True, BLACK)
+            self._panel.blit(title, title.get_rect(midtop=(panel_width // 2, y)))
+            y += title_font.get_linesize()
+        y += PANEL_PADDING // 2
+        for line in lines:
+            text = text_font.render(line, True, BLACK)
+            self._panel.blit(text, text.get_rect(midtop=(panel_width // 2, y)))
+            y += line_height
+
+        # Buttons are centered as a row along the bottom of the panel
+        row_width = len(self.buttons) * BUTTON_WIDTH + (len(self.buttons) - 1) * BUTTON_SPACING
+        left = self._panel_rect.centerx - row_width // 2
+        top = self._panel_rect.bottom - PANEL_PADDING - BUTTON_HEIGHT
+        self._button_rects = []
+        for number, text in enumerate(self.buttons):
+            rect = pygame.Rect(left + number * (BUTTON_WIDTH + BUTTON_SPACING), top, BUTTON_WIDTH, BUTTON_HEIGHT)
+            self._button_rects.append(rect)
+            label = text_font.render(text, True, BUTTON_TEXT_COLOR)
+            variants = []
+            for color in (BUTTON_COLOR, BUTTON_HOVER_COLOR):
+                button = pygame.Surface(rect.size, pygame.SRCALPHA)
+                pygame.draw.rect(button, color, button.get_rect(), border_radius=8)
+                button.blit(label, label.get_rect(center=button.get_rect().center))
+                variants.append(button)
+            self._button_surfaces[text] = variants
+
+    def show(self, surface):
+        """
+        Opens the dialog over whatever is on the surface and updates the display.
+
+        Parameters:
+        - surface (Surface): The display surface.
+        """
+        if self._layout_size != surface.get_size():
+            self._layout(surface.get_size())
+        self._backdrop = surface.copy()
+        self._dimmed = surface.copy()
+        dim = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+        dim.fill(DIM_COLOR)
+        self._dimmed.blit(dim, (0, 0))
+        self._dimmed.blit(self._panel, self._panel_rect)
+        self._hovered = None
+        self.draw(surface)
+
+    def draw(self, surface):
+        """
+        Draws the whole dialog, e.g. after the window was exposed.
+
+        Parameters:
+        - surface (Surface): The display surface.
+        """
+        surface.blit(self._dimmed, (0, 0))
+        for number in range(len(self.buttons)):
+            self._draw_button(surface, number)
+        pygame.display.flip()
+
+    def _draw_button(self, surface, number):
+        """
+        Draws the variant of a button for its hover state.
+        """
+        text = self.buttons[number]
+        rect = self._button_rects[number]
+        surface.blit(self._dimmed, rect, rect)
+        surface.blit(self._button_surfaces[text][number == self._hovered], rect)
+
+    def close(self, surface):
+        """
+        Closes the dialog and puts back the backdrop it was shown over.
+
+        Parameters:
+        - surface (Surface): The display surface.
+        """
+        surface.blit(self._backdrop, (0, 0))
+        pygame.display.flip()
+        self._backdrop = None
+        self._dimmed = None
+
+    def handle_event(self, event, surface):
+        """
+        Handles an event while the dialog is open.
+
+        Parameters:
+        - event (Event): The pygame event.
+        - surface (Surface): The display surface.
+
+        Returns:
+        - str: The lowercase text of the chosen button, or None if no button was chosen.
+        """
+        if event.type == pygame.MOUSEMOTION:
+            hovered = None
+            for number, rect in enumerate(self._button_rects):
+                if rect.collidepoint(event.pos):
+                    hovered = number
+            if hovered != self._hovered:
+                # Repaint only the buttons whose hover state changed
+                changed = [number for number in (self._hovered, hovered) if number is not None]
+                self._hovered = hovered
+                for number in changed:
+                    self._draw_button(surface, number)
+                pygame.display.update([self._button_rects[number] for number in changed])
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left mouse button
+            for number, rect in enumerate(self._button_rects):
+                if rect.collidepoint(event.pos):
+                    return self.buttons[number].lower()
+        elif event.type == pygame.KEYDOWN and self.buttons:
+            if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                return self.buttons[0].lower()
+            if event.key == pygame.K_ESCAPE:
+                return self.buttons[-1].lower()
+            if event.key == pygame.K_y and "Yes" in self.buttons:
+                return "yes"
+            if event.key == pygame.K_n and "No" in self.buttons:
+                return "no"
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.draw(surface)
+        return None
+
+def confirm_dialog(title, message):
+    """
+    Creates a dialog with Yes and No buttons.
+
+    Parameters:
+    - title (str): The title of the dialog.
+    - message (str): The question to ask.
+
+    Returns:
+    - Dialog: The dialog, answered with "yes" or "no".
+    """
+    return Dialog(title, message, ("Yes", "No"))
+
+def info_dialog(title, message):
+    """
+    Creates a dialog with an OK button.
+
+    Parameters:
+    - title (str): The title of the dialog.
+    - message (str): The message to show.
+
+    Returns:
+    - Dialog: The dialog, answered with "ok".
+    """
+    return Dialog(title, message, ("OK",))
+
+def notice_dialog(title, message):
+    """
+    Creates a dialog without buttons, e.g. to show that the game is busy.
+
+    Parameters:
+    - title (str): The title of the dialog.
+    - message (str): The message to show.
+
+    Returns:
+    - Dialog: The dialog, closed by its owner rather than answered.
+    """
+    return Dialog(title, message, ())
@@ -0,0 +1,137 @@
+"""
+profiling.py
+
+This file defines the LoopProfiler class, which captures a cProfile profile of the
+running game loop on demand. When a capture stops, it is written both as a .prof
+file for pstats or snakeviz and as a collapsed-stack text file for flame graph
+tools such as flamegraph.pl or speedscope.
+
+cProfile records callers and callees rather than whole stacks, so the collapsed
+stacks are rebuilt from the call graph: the time of a function is split between
+its callers in proportion to the time each of them spent calling it.
+
+Class:
+- LoopProfiler: Starts and stops a profile capture and writes the results.
+
+Functions:
+- collapsed_stacks(stats): Rebuilds collapsed stacks from profile statistics.
+- write_collapsed_stacks(stats, path): Writes collapsed stacks to a text file.
+"""
+
+import cProfile
+import os
+import pstats
+import time
+
+MAX_DEPTH = 64
+MIN_MICROSECONDS = 1  # Paths with less time are left out
+
+def _label(func):
+    """
+    Returns a flame graph frame name for a pstats function key.
+    """
+    filename, line, name = func
+    if filename == "~":
+        return name  # Built-in function
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+def collapsed_stacks(stats):
+    """
+    Rebuilds collapsed stacks from profile statistics.
+
+    Parameters:
+    - stats (Stats): The pstats statistics of a profile.
+
+    Returns:
+    - dict: The time in microseconds spent in each stack, keyed by the frame names
+      of the stack joined with semicolons, outermost first.
+    """
+    raw = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge
+    stacks = {}
+
+    def walk(func, path, own_time, total_time):
+        path = path + (_label(func),)
+        micros = int(own_time * 1e6)
+        if micros >= MIN_MICROSECONDS:
+            key = ";".join(path)
+            stacks[key] = stacks.get(key, 0) + micros
+        func_total = raw[func][3]
+        if len(path) >= MAX_DEPTH or func_total <= 0:
+            return
+        share = total_time / func_total  # Part of this function's time spent on this path
+        for callee, (_, _, edge_own, edge_total) in callees.get(func, {}).items():
+            if _label(callee) in path or edge_total * share * 1e6 < MIN_MICROSECONDS:
+                continue  # Recursion is folded into the outermost call
+            walk(callee, path, edge_own * share, edge_total * share)
+
+    for func, (_, _, own_time, total_time, callers) in raw.items():
+        if not callers:
+            walk(func, (), own_time, total_time)
+    return stacks
+
+def write_collapsed_stacks(stats, path):
+    """
+    Writes collapsed stacks to a text file, one "frame;frame;frame microseconds"
+    line per stack.
+
+    Parameters:
+    - stats (Stats): The pstats statistics of a profile.
+    - path (str): The path of the text file.
+    """
+    with open(path, "w", encoding="utf-8") as stack_file:
+        for stack, micros in sorted(collapsed_stacks(stats).items()):
+            stack_file.write(f"{stack} {micros}\n")
+
+class LoopProfiler:
+    """
+    Starts and stops a profile capture of the thread running the game loop.
+
+    Attributes:
+    - directory (str): The directory the profiles are written to.
+    - enabled (bool): Whether a capture is running.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.enabled = False
+        self._profile = None
+
+    def start(self):
+        """
+        Starts a capture.
+        """
+        self._profile = cProfile.Profile()
+        self.enabled = True
+        self._profile.enable()
+
+    def stop(self):
+        """
+        Stops the capture and writes the .prof and collapsed-stack files.
+
+        Returns:
+        - str: The path of the .prof file. The collapsed stacks are written next to
+          it with the extension .collapsed.txt.
+        """
+        self._profile.disable()
+        self.enabled = False
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, time.strftime("profile-%Y%m%d-%H%M%S"))
+        self._profile.dump_stats(base + ".prof")
+        write_collapsed_stacks(pstats.Stats(self._profile), base + ".collapsed.txt")
+        self._profile = None
+        return base + ".prof"
+
+    def toggle(self):
+        """
+        Starts a capture, or stops the running one and writes it.
+
+        Returns:
+        - str: The path of the .prof file if a capture was stopped, otherwise None.
+        """
+        if self.enabled:
+            return self.stop()
+        self.start()
+        return None
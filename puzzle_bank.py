@@ -0,0 +1,320 @@
+"""
+puzzle_bank.py
+
+This file defines the puzzle bank file format, which stores many puzzles and their
+solutions in one compact file that can be memory-mapped and read by index.
+
+File layout (all integers little-endian):
+- Header: magic b"SDKB", version (u16), record size (u16), level count (u32).
+- Index: one entry per difficulty level with the difficulty (u16), a reserved
+  field (u16), the puzzle count (u32) and the byte offset of its first record (u64).
+- Records: grouped by difficulty level, RECORD_SIZE bytes each. A record holds
+  the solution packed two cells per byte (41 bytes) followed by an 81-bit mask of
+  the given cells (11 bytes). The puzzle is the solution with the non-given cells
+  cleared, so it does not need to be stored separately.
+
+Classes:
+- PuzzleBank: Reads puzzles from a memory-mapped bank file.
+- PuzzleBankWriter: Writes puzzles to a bank file without holding them in memory.
+
+Functions:
+- pack_record(puzzle, solution): Packs a puzzle and its solution into a record.
+- unpack_record(record): Unpacks a record into a puzzle and its solution.
+"""
+
+import mmap
+import os
+import random
+import shutil
+import struct
+import tempfile
+
+MAGIC = b"SDKB"
+VERSION = 1
+SOLUTION_BYTES = 41
+GIVENS_BYTES = 11
+RECORD_SIZE = SOLUTION_BYTES + GIVENS_BYTES
+
+HEADER = struct.Struct("<4sHHI")
+INDEX_ENTRY = struct.Struct("<HHIQ")
+
+# High and low nibble of every byte value, used to unpack solutions quickly
+_NIBBLE_PAIRS = [(value >> 4, value & 0x0F) for value in range(256)]
+
+
+def pack_record(puzzle, solution):
+    """
+    Packs a puzzle and its solution into a record.
+
+    Parameters:
+    - puzzle (list): The 9x9 puzzle board, with 0 for empty cells.
+    - solution (list): The 9x9 solution board.
+
+    Returns:
+    - bytes: The RECORD_SIZE byte record.
+    """
+    cells = [digit for row in solution for digit in row] + [0]
+    packed = bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2))
+    givens = 0
+    for index in range(81):
+        digit = puzzle[index // 9][index % 9]
+        if digit:
+            if digit != cells[index]:
+                raise ValueError("Puzzle givens do not match the solution")
+            givens |= 1 << index
+    return packed + givens.to_bytes(GIVENS_BYTES, "little")
+
+
+def unpack_record(record):
+    """
+    Unpacks a record into a puzzle and its solution.
+
+    Parameters:
+    - record (bytes): A RECORD_SIZE byte record.
+
+    Returns:
+    - puzzle (list): The 9x9 puzzle board, with 0 for empty cells.
+    - solution (list): The 9x9 solution board.
+    """
+    cells = []
+    for value in record[:SOLUTION_BYTES]:
+        cells.extend(_NIBBLE_PAIRS[value])
+    givens = int.from_bytes(record[SOLUTION_BYTES:RECORD_SIZE], "little")
+    puzzle = [cells[index] if givens >> index & 1 else 0 for index in range(81)]
+    return (
+        [puzzle[row * 9:row * 9 + 9] for row in range(9)],
+        [cells[row * 9:row * 9 + 9] for row in range(9)],
+    )
+
+
+class PuzzleBank:
+    """
+    Reads puzzles from a memory-mapped bank file. Only the header and index are
+    parsed when the bank is opened; records are decoded when they are requested.
+
+    Attributes:
+    - path (str): The path of the bank file.
+    - levels (dict): The puzzle count and record offset for each difficulty level.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as bank_file:
+            if os.fstat(bank_file.fileno()).st_size == 0:
+                raise ValueError(f"{path} is empty, not a puzzle bank")
+            self._mm = mmap.mmap(bank_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self.levels = self._read_index()
+        except ValueError:
+            self._mm.close()
+            raise
+
+    def _read_index(self):
+        """
+        Parses the header and index, checking that every level lies within the file.
+
+        Returns:
+        - dict: The puzzle count and record offset for each difficulty level.
+        """
+        size = len(self._mm)
+        if size < HEADER.size:
+            raise ValueError(f"{self.path} is not a supported puzzle bank")
+        magic, version, record_size, level_count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{self.path} is not a supported puzzle bank")
+        if HEADER.size + level_count * INDEX_ENTRY.size > size:
+            raise ValueError(f"{self.path} is truncated: its index is incomplete")
+
+        levels = {}
+        for level in range(level_count):
+            difficulty, _, count, offset = INDEX_ENTRY.unpack_from(self._mm, HEADER.size + level * INDEX_ENTRY.size)
+            if offset + count * RECORD_SIZE > size:
+                raise ValueError(f"{self.path} is truncated: difficulty {difficulty} runs past the end of the file")
+            levels[difficulty] = (count, offset)
+        return levels
+
+    def __len__(self):
+        return sum(count for count, _ in self.levels.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def count(self, difficulty):
+        """
+        Returns the number of puzzles stored for a difficulty level.
+
+        Parameters:
+        - difficulty (int): The difficulty level.
+
+        Returns:
+        - int: The number of puzzles, 0 if the level is not in the bank.
+        """
+        return self.levels.get(difficulty, (0, 0))[0]
+
+    def record(self, difficulty, index):
+        """
+        Returns the raw record of a puzzle.
+
+        Parameters:
+        - difficulty (int): The difficulty level.
+        - index (int): The index of the puzzle within the level.
+
+        Returns:
+        - bytes: The RECORD_SIZE byte record.
+        """
+        count, offset = self.levels[difficulty]
+        if not 0 <= index < count:
+            raise IndexError(f"Puzzle {index} is out of range for difficulty {difficulty}")
+        start = offset + index * RECORD_SIZE
+        return self._mm[start:start + RECORD_SIZE]
+
+    def records(self, difficulty):
+        """
+        Returns the raw records of a difficulty level as one buffer, without
+        copying them out of the memory map. The buffer must be released before
+        the bank is closed.
+
+        Parameters:
+        - difficulty (int): The difficulty level.
+
+        Returns:
+        - memoryview: count * RECORD_SIZE bytes, empty if the level is not in the bank.
+        """
+        count, offset = self.levels.get(difficulty, (0, 0))
+        return memoryview(self._mm)[offset:offset + count * RECORD_SIZE]
+
+    def get(self, difficulty, index):
+        """
+        Reads a puzzle and its solution.
+
+        Parameters:
+        - difficulty (int): The difficulty level.
+        - index (int): The index of the puzzle within the level.
+
+        Returns:
+        - puzzle (list): The 9x9 puzzle board, with 0 for empty cells.
+        - solution (list): The 9x9 solution board.
+        """
+        return unpack_record(self.record(difficulty, index))
+
+    def random_puzzle(self, difficulty=None, rng=None):
+        """
+        Reads a random puzzle and its solution.
+
+        Parameters:
+        - difficulty (int): The difficulty level, or None for any level.
+        - rng (Random): The random number generator to draw from.
+
+        Returns:
+        - puzzle (list): The 9x9 puzzle board, with 0 for empty cells.
+        - solution (list): The 9x9 solution board.
+        Or None if the bank, or the difficulty level, holds no puzzles.
+        """
+        rng = rng or random
+        total = len(self) if difficulty is None else self.count(difficulty)
+        if total == 0:
+            return None
+        if difficulty is None:
+            position = rng.randrange(total)
+            for difficulty, (count, _) in sorted(self.levels.items()):
+                if position < count:
+                    return self.get(difficulty, position)
+                position -= count
+        return self.get(difficulty, rng.randrange(total))
+
+    def close(self):
+        """
+        Closes the memory map.
+        """
+        self._mm.close()
+
+
+class PuzzleBankWriter:
+    """
+    Writes puzzles to a bank file. Records are spooled to one temporary file per
+    difficulty level and assembled into the bank when the writer is closed, so
+    memory use does not grow with the number of puzzles.
+
+    Attributes:
+    - path (str): The path of the bank file to write.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._spools = {}
+        self._counts = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def add(self, puzzle, solution, difficulty=0):
+        """
+        Adds a puzzle to the bank.
+
+        Parameters:
+        - puzzle (list): The 9x9 puzzle board, with 0 for empty cells.
+        - solution (list): The 9x9 solution board.
+        - difficulty (int): The difficulty level to file the puzzle under.
+        """
+        self.add_record(pack_record(puzzle, solution), difficulty)
+
+    def add_record(self, record, difficulty=0):
+        """
+        Adds an already packed record to the bank.
+
+        Parameters:
+        - record (bytes): A RECORD_SIZE byte record.
+        - difficulty (int): The difficulty level to file the puzzle under.
+        """
+        spool = self._spools.get(difficulty)
+        if spool is None:
+            spool = self._spools[difficulty] = tempfile.TemporaryFile()
+            self._counts[difficulty] = 0
+        spool.write(record)
+        self._counts[difficulty] += 1
+
+    def close(self):
+        """
+        Writes the header, the index and all spooled records to the bank file. The
+        file is written under a temporary name and then renamed, so a crash never
+        leaves a half-written bank behind. Closing an already closed writer does
+        nothing.
+        """
+        if self._closed:
+            return
+        levels = sorted(self._spools)
+        offset = HEADER.size + len(levels) * INDEX_ENTRY.size
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "wb") as bank_file:
+                bank_file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, len(levels)))
+                for difficulty in levels:
+                    bank_file.write(INDEX_ENTRY.pack(difficulty, 0, self._counts[difficulty], offset))
+                    offset += self._counts[difficulty] * RECORD_SIZE
+                for difficulty in levels:
+                    spool = self._spools[difficulty]
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, bank_file)
+            os.replace(temp_path, self.path)
+        finally:
+            self._discard()
+
+    def _discard(self):
+        """
+        Closes and removes the temporary spool files. The writer is closed after
+        this.
+        """
+        for spool in self._spools.values():
+            spool.close()
+        self._spools = {}
+        self._counts = {}
+        self._closed = True
@@ -0,0 +1,112 @@
+"""
+puzzle_pool.py
+
+This file defines the PuzzlePool class, which generates puzzles in a background
+thread so that a new game can start without waiting for the generator.
+
+Class:
+- PuzzlePool: Keeps a queue of ready puzzles filled by a worker thread.
+"""
+
+import queue
+import random
+import threading
+import time
+from sudoku_generator import build_board, generate_puzzle
+
+DEFAULT_DEPTH = 3
+
+class PuzzlePool:
+    """
+    Keeps a queue of ready puzzles filled by a worker thread.
+
+    Attributes:
+    - depth (int): The number of puzzles kept ready.
+    - clues (int): The target number of givens for each puzzle, or None for the
+      default of the board size.
+    - size (int): The side of the board.
+    - last_generation_time (float): How long the puzzle last returned by get() took
+      to generate, in seconds.
+    """
+    def __init__(self, depth=DEFAULT_DEPTH, clues=None, size=9):
+        self.depth = depth
+        self.clues = clues
+        self.size = size
+        self._ready = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = None
+        self._rng = random.Random()
+        self.last_generation_time = None
+
+    def start(self):
+        """
+        Starts the worker thread if it is not already running.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._fill, name="puzzle-pool", daemon=True)
+            self._thread.start()
+
+    def _fill(self):
+        """
+        Generates puzzles until the pool is stopped, blocking while the queue is full.
+        """
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            generated = generate_puzzle(self.clues, self._rng, self.size, self._stop)
+            if generated is None:
+                return  # Stopped while generating
+            puzzle, solution = generated
+            item = (puzzle, solution, time.perf_counter() - start)
+            while not self._stop.is_set():
+                try:
+                    self._ready.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def get(self, timeout=None):
+        """
+        Takes a ready puzzle. If none is ready but the worker is running, waits for
+        the puzzle it is generating rather than generating a second one alongside
+        it; only a pool without a running worker generates one synchronously.
+
+        Parameters:
+        - timeout (float): The most seconds to wait for the worker, or None to wait
+          until its puzzle is ready. Callers that must stay responsive, like the
+          game window, call again until a puzzle is returned.
+
+        Returns:
+        - cells: The board for the Sudoku puzzle, indexable as a grid of cells.
+        - solution: The solution for the Sudoku puzzle.
+        Or None if the timeout passed before the worker had a puzzle ready.
+        """
+        try:
+            puzzle, solution, self.last_generation_time = self._ready.get_nowait()
+        except queue.Empty:
+            item = None
+            deadline = None if timeout is None else time.perf_counter() + timeout
+            while item is None and self._thread is not None and self._thread.is_alive():
+                wait = 0.1 if deadline is None else min(0.1, deadline - time.perf_counter())
+                if wait <= 0:
+                    return None
+                try:
+                    item = self._ready.get(timeout=wait)
+                except queue.Empty:
+                    continue
+            if item is None:
+                start = time.perf_counter()
+                puzzle, solution = generate_puzzle(self.clues, size=self.size)
+                item = (puzzle, solution, time.perf_counter() - start)
+            puzzle, solution, self.last_generation_time = item
+        return build_board(puzzle, solution), solution
+
+    def stop(self):
+        """
+        Stops the worker thread and waits for it to finish. The worker gives up the
+        puzzle it is generating, so this returns within one uniqueness check.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
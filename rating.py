@@ -0,0 +1,277 @@
+"""
+rating.py
+
+This file contains the difficulty rating engine. A puzzle is solved with a ladder of
+human solving techniques, always using the easiest technique that makes progress,
+and is scored by the hardest technique it needed and how often each was used.
+Ratings are memoized by puzzle, so a board is only rated once.
+
+Functions:
+- rate_puzzle(board): Rates a 9x9 puzzle.
+- difficulty_level(score): Maps a score to one of the difficulty levels.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from itertools import combinations
+from solver import ALL_DIGITS, POPCOUNT
+from tables import BOX_OF, BOX_UNITS, COL_OF, COL_UNITS, PEERS, ROW_OF, ROW_UNITS, UNITS
+
+# Difficulty levels
+EASY = 0
+MEDIUM = 1
+HARD = 2
+EXPERT = 3
+UNRATED = 4  # Needs techniques beyond the ladder
+LEVEL_NAMES = ("Easy", "Medium", "Hard", "Expert", "Unrated")
+
+Rating = namedtuple("Rating", ["score", "level", "hardest", "counts"])
+
+
+def _place(cells, candidates, index, digit):
+    """
+    Places a digit and removes it from the candidates of the cell's peers.
+    """
+    bit = 1 << (digit - 1)
+    cells[index] = digit
+    candidates[index] = 0
+    for peer in PEERS[index]:
+        candidates[peer] &= ~bit
+
+
+def _eliminate(candidates, cells, mask):
+    """
+    Removes the digits in mask from the candidates of the given cells.
+
+    Returns:
+    - bool: True if any candidate was removed.
+    """
+    removed = False
+    for index in cells:
+        if candidates[index] & mask:
+            candidates[index] &= ~mask
+            removed = True
+    return removed
+
+
+def _hidden_singles(cells, candidates):
+    """
+    Places every digit that fits in only one cell of a unit.
+    """
+    placed = 0
+    for unit in UNITS:
+        once = 0
+        twice = 0
+        for index in unit:
+            twice |= once & candidates[index]
+            once |= candidates[index]
+        hidden = once & ~twice
+        while hidden:
+            bit = hidden & -hidden
+            hidden ^= bit
+            for index in unit:
+                if candidates[index] & bit:
+                    _place(cells, candidates, index, bit.bit_length())
+                    placed += 1
+                    break
+    return placed
+
+
+def _naked_singles(cells, candidates):
+    """
+    Places the digit of every cell that has a single candidate left.
+    """
+    placed = 0
+    for index in range(81):
+        mask = candidates[index]
+        if mask and POPCOUNT[mask] == 1:
+            _place(cells, candidates, index, mask.bit_length())
+            placed += 1
+    return placed
+
+
+def _locked_candidates(cells, candidates):
+    """
+    Pointing: a digit confined to one row or column of a box is removed from the
+    rest of that line. Claiming: a digit confined to one box within a line is
+    removed from the rest of that box.
+    """
+    uses = 0
+    for box, unit in enumerate(BOX_UNITS):
+        for bit in (1 << d for d in range(9)):
+            spots = [index for index in unit if candidates[index] & bit]
+            if len(spots) < 2:
+                continue
+            for line_of, lines in ((ROW_OF, ROW_UNITS), (COL_OF, COL_UNITS)):
+                line = line_of[spots[0]]
+                if all(line_of[index] == line for index in spots):
+                    others = [index for index in lines[line] if BOX_OF[index] != box]
+                    if _eliminate(candidates, others, bit):
+                        uses += 1
+    for lines in (ROW_UNITS, COL_UNITS):
+        for unit in lines:
+            for bit in (1 << d for d in range(9)):
+                spots = [index for index in unit if candidates[index] & bit]
+                if len(spots) < 2:
+                    continue
+                box = BOX_OF[spots[0]]
+                if all(BOX_OF[index] == box for index in spots):
+                    others = [index for index in BOX_UNITS[box] if index not in unit]
+                    if _eliminate(candidates, others, bit):
+                        uses += 1
+    return uses
+
+
+def _naked_subsets(size):
+    """
+    Builds the technique that finds size cells in a unit whose candidates are
+    limited to size digits, and removes those digits from the rest of the unit.
+    """
+    def technique(cells, candidates):
+        uses = 0
+        for unit in UNITS:
+            pool = [index for index in unit if 2 <= POPCOUNT[candidates[index]] <= size]
+            for group in combinations(pool, size):
+                mask = 0
+                for index in group:
+                    mask |= candidates[index]
+                if POPCOUNT[mask] == size:
+                    others = [index for index in unit if index not in group]
+                    if _eliminate(candidates, others, mask):
+                        uses += 1
+        return uses
+    return technique
+
+
+def _hidden_subsets(size):
+    """
+    Builds the technique that finds size digits confined to the same size cells of
+    a unit, and removes every other candidate from those cells.
+    """
+    def technique(cells, candidates):
+        uses = 0
+        for unit in UNITS:
+            spots = {}
+            for digit in range(9):
+                bit = 1 << digit
+                found = [index for index in unit if candidates[index] & bit]
+                if 2 <= len(found) <= size:
+                    spots[bit] = found
+            for group in combinations(spots, size):
+                group_cells = set()
+                for bit in group:
+                    group_cells.update(spots[bit])
+                if len(group_cells) == size:
+                    keep = sum(group)
+                    if _eliminate(candidates, group_cells, ALL_DIGITS & ~keep):
+                        uses += 1
+        return uses
+    return technique
+
+
+def _x_wing(cells, candidates):
+    """
+    A digit that fits in the same two columns of two rows is removed from the rest
+    of those columns, and likewise with rows and columns swapped.
+    """
+    uses = 0
+    for lines, cross_of, cross_lines in ((ROW_UNITS, COL_OF, COL_UNITS), (COL_UNITS, ROW_OF, ROW_UNITS)):
+        for bit in (1 << d for d in range(9)):
+            pairs = {}
+            for line, unit in enumerate(lines):
+                found = [cross_of[index] for index in unit if candidates[index] & bit]
+                if len(found) == 2:
+                    pairs.setdefault(tuple(found), []).append(line)
+            for crosses, matched in pairs.items():
+                if len(matched) != 2:
+                    continue
+                wing = set(lines[matched[0]]) | set(lines[matched[1]])
+                for cross in crosses:
+                    others = [index for index in cross_lines[cross] if index not in wing]
+                    if _eliminate(candidates, others, bit):
+                        uses += 1
+    return uses
+
+
+# Techniques from easiest to hardest: name, function and weight
+TECHNIQUES = (
+    ("Hidden single", _hidden_singles, 1),
+    ("Naked single", _naked_singles, 2),
+    ("Locked candidates", _locked_candidates, 5),
+    ("Naked pair", _naked_subsets(2), 8),
+    ("Hidden pair", _hidden_subsets(2), 10),
+    ("Naked triple", _naked_subsets(3), 14),
+    ("Hidden triple", _hidden_subsets(3), 16),
+    ("X-Wing", _x_wing, 20),
+)
+UNRATED_WEIGHT = 50
+WEIGHTS = {name: weight for name, _, weight in TECHNIQUES}
+
+# The weight of the hardest technique needed decides the level
+LEVEL_THRESHOLDS = ((1, EASY), (2, MEDIUM), (10, HARD), (20, EXPERT))
+
+
+def difficulty_level(score):
+    """
+    Maps a score to one of the difficulty levels.
+
+    Parameters:
+    - score (int): The score of a rated puzzle.
+
+    Returns:
+    - int: The difficulty level, from EASY to UNRATED.
+    """
+    hardest_weight = score // 100
+    for weight, level in LEVEL_THRESHOLDS:
+        if hardest_weight <= weight:
+            return level
+    return UNRATED
+
+
+@lru_cache(maxsize=65536)
+def _rate(key):
+    """
+    Rates the puzzle encoded in key, one byte per cell.
+    """
+    cells = list(key)
+    candidates = [ALL_DIGITS if digit == 0 else 0 for digit in cells]
+    for index, digit in enumerate(cells):
+        if digit:
+            bit = 1 << (digit - 1)
+            for peer in PEERS[index]:
+                candidates[peer] &= ~bit
+
+    counts = {}
+    hardest = 0
+    while 0 in cells:
+        for rank, (name, technique, weight) in enumerate(TECHNIQUES):
+            uses = technique(cells, candidates)
+            if uses:
+                counts[name] = counts.get(name, 0) + uses
+                hardest = max(hardest, rank)
+                break
+        else:
+            hardest = len(TECHNIQUES)
+            break
+
+    if hardest == len(TECHNIQUES):
+        hardest_name, hardest_weight = None, UNRATED_WEIGHT
+    else:
+        hardest_name, hardest_weight = TECHNIQUES[hardest][0], TECHNIQUES[hardest][2]
+    score = hardest_weight * 100 + min(99, sum(WEIGHTS[name] * uses for name, uses in counts.items()) // 10)
+    return Rating(score, difficulty_level(score), hardest_name, tuple(sorted(counts.items())))
+
+
+def rate_puzzle(board):
+    """
+    Rates a 9x9 puzzle.
+
+    Parameters:
+    - board (list): The 9x9 puzzle board, with 0 for empty cells.
+
+    Returns:
+    - Rating: The score, the difficulty level, the name of the hardest technique
+      needed (None if the ladder could not solve it) and how often each technique
+      was used.
+    """
+    return _rate(bytes(digit or 0 for row in board for digit in row))
@@ -0,0 +1,302 @@
+"""
+recording.py
+
+This file records the input of a game session as a compact binary stream, and
+replays a recording through the event handlers without a window, either as fast
+as possible or in real time. Replays reproduce a session exactly, which makes
+them useful for chasing reported slowdowns and as benchmark workloads.
+
+Only the key presses and clicks that reach the board are recorded, as four fields
+per event: the time since the previous event, the event type, the key or the cell
+index, and the modifier keys or the click count. A recording starts with the ID
+of the puzzle and the board it started from in the save file format (see
+journal.py), so a continued game replays from where it was resumed.
+
+File layout (all integers little-endian):
+- Header: magic b"SDKR", version (u16), puzzle ID (16 bytes, see cache.puzzle_key),
+  length of the starting board (u32).
+- The starting board, in the save file format.
+- Events, EVENT.size bytes each: milliseconds since the previous event (u16,
+  longer pauses are clamped), type (u8), key or cell index (u16), modifiers or
+  click count (u16).
+
+Usage:
+    python recording.py RECORDING [--realtime] [--render]
+
+Classes:
+- InputRecorder: Records the input of one game session to a file.
+- Recording: A loaded recording.
+- ReplayResult: The outcome and timings of a replay.
+
+Functions:
+- encode_key(key): Packs a pygame key code into 16 bits.
+- decode_key(code): Unpacks a key code packed by encode_key.
+- load_recording(path): Reads a recording file.
+- start_board(recording): Builds the board a recorded session started from.
+- replay(recording, realtime, renderer, surface): Replays a recording through the event handlers.
+- main(argv): Parses the arguments and replays a recording.
+"""
+
+import argparse
+import os
+import struct
+import time
+from collections import namedtuple
+import pygame
+from cache import puzzle_key
+from cell import CELL_SIZES, digit_symbol
+from events import handle_board_event
+from journal import decode_game, encode_game
+from sudoku_generator import build_board, initialize_grid
+
+RECORDING_MAGIC = b"SDKR"
+RECORDING_VERSION = 1
+HEADER = struct.Struct("<4sH16sI")
+EVENT = struct.Struct("<HBHH")
+EVENT_KEY = 1
+EVENT_CLICK = 2
+MAX_DELTA_MS = 0xFFFF
+
+# SDL key codes for keys without a character have bit 30 set and a scan code in
+# the low bits, so they are stored as the scan code with bit 15 set
+SCANCODE_KEY = 1 << 30
+SCANCODE_FLAG = 0x8000
+
+Recording = namedtuple("Recording", ["puzzle_id", "game", "events"])
+Recording.__doc__ = """
+A loaded recording.
+
+Attributes:
+- puzzle_id (bytes): The 16-byte ID of the puzzle.
+- game (bytes): The board the session started from, in the save file format.
+- events (list): The delay in milliseconds, type, key or cell index, and
+  modifiers or click count of each event.
+"""
+
+ReplayResult = namedtuple("ReplayResult", ["board", "completed", "latencies", "elapsed"])
+ReplayResult.__doc__ = """
+The outcome and timings of a replay.
+
+Attributes:
+- board (Board): The board after the replay.
+- completed (bool): Whether the replay completed the puzzle.
+- latencies (list): The seconds spent handling (and drawing) each event.
+- elapsed (float): The duration of the whole replay, in seconds.
+"""
+
+def encode_key(key):
+    """
+    Packs a pygame key code into 16 bits.
+
+    Parameters:
+    - key (int): The pygame key code.
+
+    Returns:
+    - int: The packed key code.
+    """
+    if key & SCANCODE_KEY:
+        return SCANCODE_FLAG | (key & (SCANCODE_FLAG - 1))
+    return key & (SCANCODE_FLAG - 1)
+
+def decode_key(code):
+    """
+    Unpacks a key code packed by encode_key.
+
+    Parameters:
+    - code (int): The packed key code.
+
+    Returns:
+    - int: The pygame key code.
+    """
+    if code & SCANCODE_FLAG:
+        return SCANCODE_KEY | (code & (SCANCODE_FLAG - 1))
+    return code
+
+class InputRecorder:
+    """
+    Records the input of one game session. Events are kept in memory, a few bytes
+    each, and written to the file by save().
+
+    Attributes:
+    - path (str): The path of the recording file.
+    - board (Board): The board the events are applied to.
+    - puzzle_id (bytes): The 16-byte ID of the puzzle.
+    """
+    def __init__(self, path, board):
+        self.path = path
+        self.board = board
+        self.puzzle_id = puzzle_key(board.puzzle_rows())
+        self._game = encode_game(board)
+        self._events = bytearray()
+        self._last_time = time.perf_counter()
+
+    def record(self, event, click_count=1):
+        """
+        Records a key press or click that is about to be handled. Clicks outside
+        the board are not recorded.
+
+        Parameters:
+        - event (Event): A KEYDOWN or MOUSEBUTTONDOWN event.
+        - click_count (int): The number of clicks in a row, 2 for a double click.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            cell_size = CELL_SIZES[self.board.size]
+            col, row = event.pos[0] // cell_size, event.pos[1] // cell_size
+            if not (0 <= row < self.board.size and 0 <= col < self.board.size):
+                return
+            kind, code, extra = EVENT_CLICK, row * self.board.size + col, click_count
+        else:
+            kind, code, extra = EVENT_KEY, encode_key(event.key), event.mod & 0xFFFF
+        now = time.perf_counter()
+        delta = min(MAX_DELTA_MS, int((now - self._last_time) * 1000))
+        self._last_time = now
+        self._events += EVENT.pack(delta, kind, code, extra)
+
+    def save(self):
+        """
+        Writes the recording file.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "wb") as recording_file:
+            recording_file.write(HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, self.puzzle_id, len(self._game)))
+            recording_file.write(self._game)
+            recording_file.write(self._events)
+
+def load_recording(path):
+    """
+    Reads a recording file. A partly written last event is dropped, but a file cut
+    short in its header or starting board raises ValueError.
+
+    Parameters:
+    - path (str): The path of the recording file.
+
+    Returns:
+    - Recording: The puzzle ID, starting board and events of the session.
+    """
+    with open(path, "rb") as recording_file:
+        data = recording_file.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a recording")
+    magic, version, puzzle_id, game_size = HEADER.unpack_from(data, 0)
+    if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+        raise ValueError(f"{path} is not a supported recording")
+    offset = HEADER.size + game_size
+    if offset > len(data):
+        raise ValueError(f"{path} is truncated: the starting board needs {game_size} bytes")
+    events = list(EVENT.iter_unpack(data[offset:offset + (len(data) - offset) // EVENT.size * EVENT.size]))
+    return Recording(puzzle_id, data[HEADER.size:offset], events)
+
+def _to_event(kind, code, extra, size):
+    """
+    Rebuilds the pygame event of a recorded event.
+
+    Returns:
+    - Event: The event to pass to the handlers.
+    - int: The click count, 1 for key presses.
+    """
+    if kind == EVENT_CLICK:
+        cell_size = CELL_SIZES[size]
+        row, col = divmod(code, size)
+        pos = (col * cell_size + cell_size // 2, row * cell_size + cell_size // 2)
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1), extra
+    return pygame.event.Event(pygame.KEYDOWN, key=decode_key(code), mod=extra, unicode=""), 1
+
+def start_board(recording):
+    """
+    Builds the board a recorded session started from.
+
+    Parameters:
+    - recording (Recording): The recording.
+
+    Returns:
+    - cells: The board, indexable as a grid of cells.
+    - solution: The solution for the Sudoku puzzle.
+    """
+    puzzle, solution, journal = decode_game(recording.game)
+    board = build_board(puzzle, solution)
+    board.journal = journal
+    journal.replay(board)
+    initialize_grid(board)
+    return board, solution
+
+def replay(recording, realtime=False, renderer=None, surface=None):
+    """
+    Replays a recording through the event handlers, from the board the session
+    started from, until the events run out or the puzzle is completed.
+
+    Parameters:
+    - recording (Recording): The recording to replay.
+    - realtime (bool): Whether to keep the recorded pauses between events, or
+      replay as fast as possible.
+    - renderer (BoardRenderer): If given, the board is drawn after every event, as
+      in the game.
+    - surface (Surface): The display surface to draw on, needed with a renderer.
+
+    Returns:
+    - ReplayResult: The final board, whether it was completed, and the timings.
+    """
+    board, solution = start_board(recording)
+    if renderer is not None:
+        renderer.render(surface, board)
+    selected_cell = None
+    completed = False
+    latencies = []
+    clock = time.perf_counter
+    start = due = clock()
+    for delta, kind, code, extra in recording.events:
+        if realtime:
+            due += delta / 1000
+            wait = due - clock()
+            if wait > 0:
+                time.sleep(wait)
+        event, click_count = _to_event(kind, code, extra, board.size)
+        begin = clock()
+        selected_cell, result, _ = handle_board_event(board, solution, selected_cell, event, click_count)
+        if renderer is not None:
+            renderer.render(surface, board)
+        latencies.append(clock() - begin)
+        if result == "home_screen":
+            completed = True
+            break
+    return ReplayResult(board, completed, latencies, clock() - start)
+
+def main(argv=None):
+    """
+    Parses the command-line arguments, replays a recording and prints its timings.
+
+    Parameters:
+    - argv (list): The command-line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded Sudoku game session.")
+    parser.add_argument("recording", help="path of the recording file")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded pauses between events")
+    parser.add_argument("--render", action="store_true", help="draw the board after every event, without a window")
+    args = parser.parse_args(argv)
+
+    recording = load_recording(args.recording)
+    renderer = surface = None
+    if args.render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from renderer import BoardRenderer, board_pixels
+        size = start_board(recording)[0].size
+        pygame.init()
+        surface = pygame.display.set_mode((board_pixels(size), board_pixels(size)))
+        renderer = BoardRenderer(board_pixels(size), size)
+
+    result = replay(recording, args.realtime, renderer, surface)
+    recorded = sum(delta for delta, _, _, _ in recording.events) / 1000
+    latencies = sorted(result.latencies)
+    print(f"Puzzle {recording.puzzle_id.hex()}, {result.board.size}x{result.board.size}, "
+          f"{len(recording.events)} events recorded over {recorded:.1f}s")
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1e3
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3
+        print(f"Replayed {len(latencies)} events in {result.elapsed:.3f}s: "
+              f"p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {latencies[-1] * 1e3:.3f} ms per event")
+    print(f"Completed: {'yes' if result.completed else 'no'}")
+    print("Final board: " + "".join(digit_symbol(digit) if digit else "0" for digit in result.board.digits))
+    if args.render:
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+renderer.py
+
+This file defines the BoardRenderer class, which draws the Sudoku board with a single
+render pass per frame. The background and grid lines are drawn once onto cached
+surfaces, and after the first frame only the cells that changed are redrawn and
+pushed to the display.
+
+Class:
+- BoardRenderer: Draws the board, redrawing only dirty cells.
+
+Functions:
+- board_pixels(size): Returns the width and height in pixels of a board.
+"""
+
+import pygame
+from cell import CELL_SIZES, WHITE
+from utils import draw_cell, draw_cells, draw_grid
+
+WINDOW_SIZE = 450
+
+
+def board_pixels(size=9):
+    """
+    Returns the width and height in pixels of a board.
+
+    Parameters:
+    - size (int): The side of the board.
+
+    Returns:
+    - int: The side of the board in pixels, WINDOW_SIZE for a 9x9 board.
+    """
+    return size * CELL_SIZES[size]
+
+class BoardRenderer:
+    """
+    Draws the board, redrawing only dirty cells.
+
+    Attributes:
+    - background (Surface): The cached background.
+    - grid_lines (Surface): The cached grid lines on a transparent surface.
+    - cell_size (int): The side of a cell in pixels.
+    - blits (int): The number of blits made by the last render.
+    """
+    def __init__(self, size=WINDOW_SIZE, board_size=9):
+        self.cell_size = CELL_SIZES[board_size]
+        self.background = pygame.Surface((size, size))
+        self.background.fill(WHITE)
+        self.grid_lines = pygame.Surface((size, size), pygame.SRCALPHA)
+        draw_grid(self.grid_lines, board_size)
+        self._full_redraw = True
+        self.blits = 0
+
+    def invalidate(self):
+        """
+        Forces the next render to redraw the whole board, e.g. after the window was
+        covered by a dialog.
+        """
+        self._full_redraw = True
+
+    def render(self, surface, grid):
+        """
+        Draws the board onto the surface and updates the display.
+
+        Parameters:
+        - surface (Surface): The display surface.
+        - grid (list): The Sudoku grid.
+        """
+        if self._full_redraw:
+            surface.blit(self.background, (0, 0))
+            blits = draw_cells(surface, grid)
+            surface.blit(self.grid_lines, (0, 0))
+            self.blits = blits + 2
+            pygame.display.flip()
+            for row in grid:
+                for cell in row:
+                    cell.dirty = False
+            self._full_redraw = False
+            return
+
+        dirty_rects = []
+        blits = 0
+        cell_size = self.cell_size
+        for row in grid:
+            for cell in row:
+                if cell.dirty:
+                    blits += draw_cell(surface, cell) + 1  # Plus the grid lines over it
+                    rect = pygame.Rect(cell.col * cell_size, cell.row * cell_size, cell_size, cell_size)
+                    surface.blit(self.grid_lines, rect, rect)
+                    dirty_rects.append(rect)
+                    cell.dirty = False
+        self.blits = blits
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
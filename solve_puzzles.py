@@ -0,0 +1,262 @@
+"""
+solve_puzzles.py
+
+This file is a command-line tool that solves a file of 9x9 puzzles in the common
+one-line format: 81 characters per puzzle, digits for the givens and 0 or . for
+empty cells. Anything after the first 81 characters, such as a comma and a rating,
+is ignored.
+
+Puzzles are read lazily from a file or stdin and solved in chunks across a pool of
+worker processes. At most a fixed number of chunks is in flight at any time, and
+results are written to stdout as soon as they are ready, in input order, so
+memory use does not grow with the size of the input.
+
+Each input line gives one output line, and blank lines are skipped. The output is
+the solution and a uniqueness flag, 1 if the solution is unique and 0 if the
+puzzle has several. A puzzle without a solution, or a line that is not a puzzle,
+gives "- 0". A summary is written to stderr.
+
+With --cache, solutions are kept in a persistent cache (see cache.py), so puzzles
+seen in an earlier run, or earlier in the same run, are not solved again. Every
+worker process keeps its own bounded in-memory cache in front of the shared
+database.
+
+Usage:
+    python solve_puzzles.py [INPUT] [--workers N] [--chunk-size 1000]
+                            [--max-pending 2] [--cache PATH] [--cache-size 65536]
+
+Functions:
+- parse_puzzle(line): Parses a puzzle line into a board.
+- format_board(board): Formats a board as an 81-character line.
+- init_cache(path, capacity): Opens the solution cache of this process.
+- solve_line(line, cache): Solves the puzzle of one input line.
+- solve_chunk(lines): Solves the puzzles of a chunk of input lines.
+- iter_chunks(lines, chunk_size): Groups input lines into chunks, lazily.
+- solve_stream(lines, output, workers, chunk_size, max_pending, cache_path, cache_size): Solves a stream of puzzle lines.
+- main(argv): Parses the arguments and solves the input.
+"""
+
+import argparse
+import collections
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from cache import DEFAULT_CAPACITY, PuzzleCache
+from solver import find_solutions
+
+EMPTY_CELLS = "0."
+NO_SOLUTION = "- 0"
+
+_cache = None  # The solution cache of this process, set by init_cache
+
+def parse_puzzle(line):
+    """
+    Parses a puzzle line into a board.
+
+    Parameters:
+    - line (str): The input line.
+
+    Returns:
+    - list: The 9x9 board, with 0 for empty cells, or None if the line does not
+      start with a puzzle.
+    """
+    text = line[:81]
+    if len(text) != 81:
+        return None
+    cells = []
+    for char in text:
+        if char in EMPTY_CELLS:
+            cells.append(0)
+        elif "1" <= char <= "9":
+            cells.append(ord(char) - 48)
+        else:
+            return None
+    return [cells[row * 9:row * 9 + 9] for row in range(9)]
+
+def format_board(board):
+    """
+    Formats a board as an 81-character line.
+
+    Parameters:
+    - board (list): The 9x9 board.
+
+    Returns:
+    - str: The digits of the board, row by row.
+    """
+    return "".join(str(digit) for row in board for digit in row)
+
+def init_cache(path, capacity=DEFAULT_CAPACITY):
+    """
+    Opens the solution cache of this process. It is the initializer of the worker
+    processes, so each of them opens its own connection to the database.
+
+    Parameters:
+    - path (str): The path of the cache database.
+    - capacity (int): The number of entries kept in memory.
+    """
+    global _cache
+    _cache = PuzzleCache(capacity, path)
+
+def solve_line(line, cache=None):
+    """
+    Solves the puzzle of one input line.
+
+    Parameters:
+    - line (str): The input line.
+    - cache (PuzzleCache): The cache to look the puzzle up in, or None to solve it.
+
+    Returns:
+    - str: The output line, the solution and the uniqueness flag, or "- 0" if the
+      line has no solvable puzzle.
+    - str: "unique", "multiple", "unsolvable" or "invalid".
+    """
+    board = parse_puzzle(line)
+    if board is None:
+        return NO_SOLUTION, "invalid"
+    if cache is not None:
+        entry = cache.solve(board)
+        solution, unique = entry.solution, entry.unique
+    else:
+        solutions = find_solutions(board, limit=2)
+        solution, unique = (solutions[0] if solutions else None), len(solutions) == 1
+    if solution is None:
+        return NO_SOLUTION, "unsolvable"
+    if unique:
+        return f"{format_board(solution)} 1", "unique"
+    return f"{format_board(solution)} 0", "multiple"
+
+def solve_chunk(lines):
+    """
+    Solves the puzzles of a chunk of input lines, through the cache of this
+    process if it has one. This is the work unit of the worker processes.
+
+    Parameters:
+    - lines (list): The input lines.
+
+    Returns:
+    - list: The output line and outcome of each input line, in order.
+    - int: The number of puzzles served from the cache.
+    """
+    if _cache is None:
+        return [solve_line(line) for line in lines], 0
+    hits = _cache.hits
+    results = [solve_line(line, _cache) for line in lines]
+    _cache.flush()  # Worker processes are stopped without closing their cache
+    return results, _cache.hits - hits
+
+def iter_chunks(lines, chunk_size):
+    """
+    Groups input lines into chunks, reading only as far as the current chunk.
+    Blank lines are skipped.
+
+    Parameters:
+    - lines (iterable): The input lines.
+    - chunk_size (int): The number of puzzles per chunk.
+
+    Yields:
+    - list: The stripped input lines of a chunk.
+    """
+    stripped = (line.strip() for line in lines)
+    puzzles = (line for line in stripped if line)
+    while True:
+        chunk = list(itertools.islice(puzzles, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def solve_stream(lines, output, workers=1, chunk_size=1000, max_pending=2, cache_path=None,
+                 cache_size=DEFAULT_CAPACITY):
+    """
+    Solves a stream of puzzle lines and writes the results in input order.
+
+    Chunks are submitted to the pool only while fewer than max_pending per worker
+    are waiting, and the oldest chunk is always written first, so the input is
+    read no faster than it is solved.
+
+    Parameters:
+    - lines (iterable): The input lines.
+    - output (file): The text file the results are written to.
+    - workers (int): The number of worker processes, 1 to solve in this process.
+    - chunk_size (int): The number of puzzles per chunk.
+    - max_pending (int): The number of chunks in flight per worker.
+    - cache_path (str): The path of the solution cache database, or None to solve
+      every puzzle.
+    - cache_size (int): The number of cache entries each process keeps in memory.
+
+    Returns:
+    - Counter: The number of puzzles with each outcome, and under "cached" the
+      number served from the cache.
+    """
+    global _cache
+    counts = collections.Counter()
+
+    def write(chunk_results):
+        results, hits = chunk_results
+        for text, outcome in results:
+            output.write(text)
+            output.write("\n")
+            counts[outcome] += 1
+        counts["cached"] += hits
+
+    chunks = iter_chunks(lines, chunk_size)
+    if workers <= 1:
+        if cache_path is not None:
+            init_cache(cache_path, cache_size)
+        try:
+            for chunk in chunks:
+                write(solve_chunk(chunk))
+        finally:
+            if _cache is not None:
+                _cache.close()
+                _cache = None
+        return counts
+
+    pending = collections.deque()
+    limit = workers * max_pending
+    initializer = None if cache_path is None else init_cache
+    with multiprocessing.Pool(workers, initializer, (cache_path, cache_size)) as pool:
+        for chunk in chunks:
+            if len(pending) >= limit:
+                write(pending.popleft().get())
+            pending.append(pool.apply_async(solve_chunk, (chunk,)))
+        while pending:
+            write(pending.popleft().get())
+    return counts
+
+def main(argv=None):
+    """
+    Parses the command-line arguments, solves the input and writes the results.
+
+    Parameters:
+    - argv (list): The command-line arguments, defaults to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(description="Solve a file of one-line Sudoku puzzles.")
+    parser.add_argument("input", nargs="?", default="-", help="path of the puzzle file, - for stdin")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="puzzles per work unit")
+    parser.add_argument("--max-pending", type=int, default=2, help="work units in flight per worker")
+    parser.add_argument("--cache", help="path of a solution cache database to read and extend")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CAPACITY,
+                        help="cache entries kept in memory per process")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    options = (args.workers, args.chunk_size, args.max_pending, args.cache, args.cache_size)
+    if args.input == "-":
+        counts = solve_stream(sys.stdin, sys.stdout, *options)
+    else:
+        with open(args.input, encoding="ascii", errors="replace") as puzzle_file:
+            counts = solve_stream(puzzle_file, sys.stdout, *options)
+    sys.stdout.flush()
+
+    elapsed = time.perf_counter() - start_time
+    total = sum(counts[outcome] for outcome in ("unique", "multiple", "unsolvable", "invalid"))
+    cached = f", {counts['cached']} from the cache" if args.cache else ""
+    print(f"Solved {total} puzzles in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} puzzles/s): "
+          f"{counts['unique']} unique, {counts['multiple']} multiple, "
+          f"{counts['unsolvable']} unsolvable, {counts['invalid']} invalid{cached}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
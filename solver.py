@@ -0,0 +1,247 @@
+"""
+solver.py
+
+This file contains the constraint solver used to solve Sudoku puzzles and to check
+whether a puzzle has a unique solution. Row, column and box candidates are tracked
+as 9-bit masks, naked and hidden singles are propagated before every branch, and
+the search always branches on the most constrained cell.
+
+This solver is specialised for the 9x9 grid. Boards of other sizes are handed to
+the exact-cover solver in exact_cover.py.
+
+Functions:
+- find_solutions(board, limit=2): Returns up to limit solutions of a board.
+- count_solutions(board, limit=2, max_nodes=None): Counts the solutions of a board, stopping at limit.
+- solve_board(board): Returns one solution of a board, or None if it has none.
+- random_filled_board(rng, size=9): Returns a random, completely filled board.
+"""
+
+import exact_cover
+from tables import BOX_OF, BOX_UNITS, COL_OF, ROW_OF, UNITS
+
+ALL_DIGITS = 0x1FF  # One bit per digit, bit 0 is digit 1
+
+POPCOUNT = [bin(mask).count("1") for mask in range(ALL_DIGITS + 1)]
+
+
+def _place(state, index, digit):
+    """
+    Places a digit in a cell and updates the row, column and box masks.
+
+    Parameters:
+    - state (tuple): The solver state (cells, rows, cols, boxes).
+    - index (int): The flat index of the cell.
+    - digit (int): The digit to place.
+    """
+    cells, rows, cols, boxes = state
+    bit = 1 << (digit - 1)
+    cells[index] = digit
+    rows[ROW_OF[index]] |= bit
+    cols[COL_OF[index]] |= bit
+    boxes[BOX_OF[index]] |= bit
+
+
+def _propagate(state):
+    """
+    Fills naked and hidden singles until nothing changes.
+
+    Parameters:
+    - state (tuple): The solver state (cells, rows, cols, boxes).
+
+    Returns:
+    - int: -1 on a contradiction, 81 when the board is solved, otherwise the index
+      of the empty cell with the fewest candidates.
+    """
+    cells, rows, cols, boxes = state
+    while True:
+        changed = False
+        best_index = 81
+        best_count = 10
+
+        # Naked singles
+        for index in range(81):
+            if cells[index]:
+                continue
+            candidates = ALL_DIGITS & ~(rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]])
+            count = POPCOUNT[candidates]
+            if count == 0:
+                return -1
+            if count == 1:
+                _place(state, index, candidates.bit_length())
+                changed = True
+            elif count < best_count:
+                best_index = index
+                best_count = count
+
+        if best_index == 81 and not changed:
+            return 81
+
+        # Hidden singles
+        for unit in UNITS:
+            once = 0
+            twice = 0
+            placed = 0
+            for index in unit:
+                digit = cells[index]
+                if digit:
+                    placed |= 1 << (digit - 1)
+                    continue
+                candidates = ALL_DIGITS & ~(rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]])
+                twice |= once & candidates
+                once |= candidates
+            if (once | placed) != ALL_DIGITS:
+                return -1
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for index in unit:
+                    if cells[index] == 0 and not (rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]]) & bit:
+                        _place(state, index, bit.bit_length())
+                        changed = True
+                        break
+                else:
+                    return -1
+
+        if not changed:
+            return best_index
+
+
+def _search(state, limit, solutions, rng=None):
+    """
+    Searches for solutions depth-first and records them until limit is reached.
+
+    Parameters:
+    - state (tuple): The solver state (cells, rows, cols, boxes).
+    - limit (int): The number of solutions after which the search stops.
+    - solutions (list): The list that found solutions are appended to.
+    - rng (Random): If given, candidates are tried in a random order.
+    """
+    index = _propagate(state)
+    if index < 0:
+        return
+    cells, rows, cols, boxes = state
+    if index == 81:
+        solutions.append(cells[:])
+        return
+
+    candidates = ALL_DIGITS & ~(rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]])
+    digits = [digit for digit in range(1, 10) if candidates & (1 << (digit - 1))]
+    if rng is not None:
+        rng.shuffle(digits)
+    for digit in digits:
+        branch = (cells[:], rows[:], cols[:], boxes[:])
+        _place(branch, index, digit)
+        _search(branch, limit, solutions, rng)
+        if len(solutions) >= limit:
+            return
+
+
+def _initial_state(board):
+    """
+    Builds the solver state from a 9x9 board.
+
+    Parameters:
+    - board (list): The 9x9 board, with 0 for empty cells.
+
+    Returns:
+    - tuple: The solver state, or None if the givens already conflict.
+    """
+    state = ([0] * 81, [0] * 9, [0] * 9, [0] * 9)
+    cells, rows, cols, boxes = state
+    for index in range(81):
+        digit = board[ROW_OF[index]][COL_OF[index]]
+        if not digit:
+            continue
+        bit = 1 << (digit - 1)
+        if (rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]]) & bit:
+            return None
+        _place(state, index, digit)
+    return state
+
+
+def find_solutions(board, limit=2):
+    """
+    Finds the solutions of a board, stopping as soon as limit solutions are found.
+    With the default limit, one search gives both a solution and whether it is
+    unique.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+    - limit (int): The maximum number of solutions to look for.
+
+    Returns:
+    - list: The solved boards found, at most limit of them.
+    """
+    if len(board) != 9:
+        return exact_cover.find_solutions(board, limit)
+    state = _initial_state(board)
+    if state is None:
+        return []
+    solutions = []
+    _search(state, limit, solutions)
+    return [[cells[row * 9:row * 9 + 9] for row in range(9)] for cells in solutions]
+
+
+def count_solutions(board, limit=2, max_nodes=None):
+    """
+    Counts the solutions of a board, stopping as soon as limit solutions are found.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+    - limit (int): The maximum number of solutions to look for.
+    - max_nodes (int): For boards other than 9x9, the number of candidates the
+      exact-cover search may try before giving up. 9x9 searches always finish.
+
+    Returns:
+    - int: The number of solutions found, capped at limit, or None if the search
+      gave up.
+    """
+    if len(board) != 9:
+        return exact_cover.count_solutions(board, limit, max_nodes)
+    state = _initial_state(board)
+    if state is None:
+        return 0
+    solutions = []
+    _search(state, limit, solutions)
+    return len(solutions)
+
+
+def solve_board(board):
+    """
+    Solves a board.
+
+    Parameters:
+    - board (list): The board, with 0 for empty cells.
+
+    Returns:
+    - list: The solved board, or None if the board has no solution.
+    """
+    solutions = find_solutions(board, 1)
+    return solutions[0] if solutions else None
+
+
+def random_filled_board(rng, size=9):
+    """
+    Builds a random, completely filled board.
+
+    Parameters:
+    - rng (Random): The random number generator to draw from.
+    - size (int): The side of the board.
+
+    Returns:
+    - list: A solved board.
+    """
+    if size != 9:
+        return exact_cover.random_filled_board(size, rng)
+    state = ([0] * 81, [0] * 9, [0] * 9, [0] * 9)
+    # The diagonal boxes do not constrain each other, so seed them directly
+    for box in (0, 4, 8):
+        digits = list(range(1, 10))
+        rng.shuffle(digits)
+        for index, digit in zip(BOX_UNITS[box], digits):
+            _place(state, index, digit)
+    solutions = []
+    _search(state, 1, solutions, rng)
+    cells = solutions[0]
+    return [cells[row * 9:row * 9 + 9] for row in range(9)]
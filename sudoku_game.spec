@@ -12,7 +12,7 @@ a = Analysis(
     hiddenimports=[],
     hookspath=[],
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter'],  # Dialogs are drawn with pygame
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
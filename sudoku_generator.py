@@ -1,82 +1,222 @@
 # sudoku_generator.py
 
-from sudoku import Sudoku
-from cell import Cell
+from board import Board
+from solver import count_solutions, random_filled_board
+from puzzle_bank import PuzzleBank
+from journal import load_game
+from rating import EASY, MEDIUM, HARD, EXPERT, rate_puzzle
+from canonical import random_variant
 import random
 
-def has_unique_solution(puzzle):
+DEFAULT_CLUES = 41  # Same number of givens as the old 50% blanking ratio
+# Candidates a uniqueness check may try on boards other than 9x9, about a quarter
+# of a second on 25x25. A removal that cannot be proven unique in time is undone,
+# and digging stops after DIG_GIVE_UPS of them.
+DIG_NODE_LIMIT = 5000
+DIG_GIVE_UPS = 8
+
+# Target number of givens when aiming for a difficulty level
+LEVEL_CLUES = {EASY: 41, MEDIUM: 32, HARD: 26, EXPERT: 22}
+
+def default_clues(size=9):
+    """
+    Return the target number of givens for a board size, keeping the same share of
+    givens as DEFAULT_CLUES on a 9x9 board.
+
+    Args:
+    - size: The side of the board.
+
+    Returns:
+    - int: The target number of givens.
+    """
+    return DEFAULT_CLUES if size == 9 else round(size * size * DEFAULT_CLUES / 81)
+
+def has_unique_solution(board):
+    """
+    Check if the given Sudoku board has a unique solution.
+
+    Args:
+    - board: The board to check, with 0 for empty cells.
+
+    Returns:
+    - bool: True if the board has a unique solution, False otherwise.
+    """
+    return count_solutions(board, limit=2) == 1
+
+def generate_puzzle(clues=None, rng=None, size=9, stop=None):
     """
-    Check if the given Sudoku puzzle has a unique solution.
+    Generate a puzzle with a unique solution by digging holes in a random full grid.
+
+    Clues are removed one at a time in random order, and a removal is kept only if
+    the board still has a unique solution. If no further clue can be removed before
+    the target is reached, the puzzle is returned with more clues than requested.
+    On boards other than 9x9, each check is limited to DIG_NODE_LIMIT candidates,
+    and digging stops once DIG_GIVE_UPS checks have given up, since the clues left
+    by then are the ones that are hardest to prove removable.
 
     Args:
-    - puzzle: The Sudoku puzzle to check.
+    - clues: The target number of givens, or None for the default of the size.
+    - rng: The random number generator to draw from.
+    - size: The side of the board: 4, 9, 16 or 25.
+    - stop: A threading.Event checked between removals; once it is set, the
+      generator gives up.
 
     Returns:
-    - bool: True if the puzzle has a unique solution, False otherwise.
-    """
-    solutions = []
-
-    def solve(board):
-        for i in range(9):
-            for j in range(9):
-                if board[i][j] == 0:
-                    for num in range(1, 10):
-                        if is_valid(board, i, j, num):
-                            board[i][j] = num
-                            solve(board)
-                            board[i][j] = 0
-                    return
-        solutions.append([row[:] for row in board])
-
-    def is_valid(board, row, col, num):
-        for x in range(9):
-            if board[row][x] == num or board[x][col] == num:
-                return False
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(3):
-            for j in range(3):
-                if board[start_row + i][start_col + j] == num:
-                    return False
-        return True
-
-    board = [row[:] for row in puzzle.board]
-    solve(board)
-    return len(solutions) == 1
-
-def create_sudoku_grid():
+    - puzzle: The puzzle board, with 0 for empty cells.
+    - solution: The solution board.
+    Or None if stop was set before the puzzle was finished.
+    """
+    if rng is None:
+        rng = random.Random()
+    if clues is None:
+        clues = default_clues(size)
+    solution = random_filled_board(rng, size)
+    puzzle = [row[:] for row in solution]
+
+    max_nodes = None if size == 9 else DIG_NODE_LIMIT
+    give_ups = 0
+    remaining = size * size
+    positions = list(range(size * size))
+    rng.shuffle(positions)
+    for index in positions:
+        if remaining <= clues:
+            break
+        if stop is not None and stop.is_set():
+            return None
+        row, col = divmod(index, size)
+        digit = puzzle[row][col]
+        puzzle[row][col] = 0
+        found = count_solutions(puzzle, limit=2, max_nodes=max_nodes)
+        if found == 1:
+            remaining -= 1
+        else:
+            puzzle[row][col] = digit
+            if found is None:
+                give_ups += 1
+                if give_ups >= DIG_GIVE_UPS:
+                    break
+
+    return puzzle, solution
+
+def generate_rated_puzzle(level, rng=None, max_attempts=50):
+    """
+    Generate a 9x9 puzzle whose difficulty rating falls in the given level.
+
+    Args:
+    - level: The difficulty level from the rating module.
+    - rng: The random number generator to draw from.
+    - max_attempts: The number of puzzles to try before giving up.
+
+    Returns:
+    - puzzle: The 9x9 puzzle board, with 0 for empty cells.
+    - solution: The 9x9 solution board.
+    - rating: The rating of the puzzle. If no attempt hit the level, the closest
+      attempt is returned.
+    """
+    if rng is None:
+        rng = random.Random()
+    best = None
+    for _ in range(max_attempts):
+        puzzle, solution = generate_puzzle(LEVEL_CLUES.get(level, 0), rng)
+        rating = rate_puzzle(puzzle)
+        if rating.level == level:
+            return puzzle, solution, rating
+        if best is None or abs(rating.level - level) < abs(best[2].level - level):
+            best = puzzle, solution, rating
+    return best
+
+def build_board(puzzle, solution):
+    """
+    Build the board for a puzzle. The size of the board follows from the puzzle.
+
+    Args:
+    - puzzle: The puzzle board, with 0 for empty cells.
+    - solution: The solution board.
+
+    Returns:
+    - Board: The board, indexable as a grid of cells.
+    """
+    return Board(puzzle, solution)
+
+def create_sudoku_grid(clues=None, size=9):
     """
     Creates a new Sudoku puzzle grid.
 
+    Args:
+    - clues: The target number of givens, or None for the default of the size.
+    - size: The side of the board: 4, 9, 16 or 25.
+
     Returns:
-    - cells: The initialized cells for the Sudoku puzzle.
+    - cells: The board for the Sudoku puzzle, indexable as a grid of cells.
     - solution: The solution for the Sudoku puzzle.
     """
-    while True:
-        # Generate a new random seed to ensure a different puzzle every time
-        seed = random.randint(0, 1000000)
-        puzzle = Sudoku(3, seed=seed).difficulty(0.5)  # Generate a 9x9 puzzle with 50% cells empty
-        solution = puzzle.solve().board  # Get the solved board
+    puzzle, solution = generate_puzzle(clues, size=size)
+    return build_board(puzzle, solution), solution
 
-        if has_unique_solution(puzzle):
-            break
+def load_puzzle_bank(path):
+    """
+    Open a puzzle bank file for reading.
 
-    cells = [
-        [Cell(row, col, puzzle.board[row][col] or 0, (200, 200, 200) if puzzle.board[row][col] else (255, 255, 255), not bool(puzzle.board[row][col]))
-         for col in range(9)]
-        for row in range(9)
-    ]
+    Args:
+    - path: The path of the bank file.
 
-    return cells, solution
+    Returns:
+    - PuzzleBank: The memory-mapped puzzle bank.
+    """
+    return PuzzleBank(path)
+
+def create_sudoku_grid_from_bank(bank, difficulty=None, rng=None, variant=False):
+    """
+    Creates a Sudoku puzzle grid from a random puzzle in a puzzle bank. If the bank
+    has no puzzles at the difficulty level, one is generated instead.
+
+    Args:
+    - bank: The PuzzleBank to read from.
+    - difficulty: The difficulty level to draw from, or None for any level.
+    - rng: The random number generator to draw from.
+    - variant: Whether to serve a random equivalent of the stored puzzle, with its
+      digits relabeled and its rows and columns shuffled, so that a small bank
+      does not repeat itself. The variant needs no solving or checking.
+
+    Returns:
+    - cells: The board for the Sudoku puzzle, indexable as a 9x9 grid of cells.
+    - solution: The solution for the Sudoku puzzle.
+    """
+    drawn = bank.random_puzzle(difficulty, rng)
+    if drawn is None:
+        if difficulty is None:
+            puzzle, solution = generate_puzzle(rng=rng)
+        else:
+            puzzle, solution, _ = generate_rated_puzzle(difficulty, rng)
+        return build_board(puzzle, solution), solution
+    puzzle, solution = drawn
+    if variant:
+        puzzle, solution = random_variant(puzzle, solution, rng)
+    return build_board(puzzle, solution), solution
+
+def load_saved_grid(path):
+    """
+    Restores a saved game by replaying its move journal onto a fresh board.
+
+    Args:
+    - path: The path of the save file.
+
+    Returns:
+    - cells: The board for the Sudoku puzzle, indexable as a grid of cells.
+    - solution: The solution for the Sudoku puzzle.
+    """
+    puzzle, solution, journal = load_game(path)
+    board = build_board(puzzle, solution)
+    board.journal = journal
+    journal.replay(board)
+    return board, solution
 
 def initialize_grid(cells):
     """
-    Initialize the grid with the given cells.
+    Initialize the grid with the given cells, clearing any selection and marking
+    every cell for redrawing.
     """
     for row in cells:
         for cell in row:
-            if cell.number == 0:
-                cell.active = True
-                cell.color = (255, 255, 255)  # White for empty cells
-            else:
-                cell.active = False
-                cell.color = (200, 200, 200)  # Grey for filled cells
+            cell.selected = False
+            cell.dirty = True
@@ -0,0 +1,129 @@
+"""
+tables.py
+
+This file contains index tables for the grid, computed once per board size. Cells are
+addressed by their flat index, row * size + col. The solver, the rating engine, move
+validation and navigation all read from these tables instead of repeating the
+index arithmetic. The module-level tables are those of the standard 9x9 grid; other
+sizes are available from get_tables(size).
+
+Tables:
+- ROW_OF, COL_OF, BOX_OF: The row, column and box of each cell.
+- ROW_UNITS, COL_UNITS, BOX_UNITS: The cells of each row, column and box.
+- UNITS: All units, rows first, then columns, then boxes.
+- UNITS_OF: The row, column and box unit of each cell.
+- PEERS: The cells that share a unit with each cell, 20 on a 9x9 grid.
+
+Functions:
+- get_tables(size): Returns the tables of a board size.
+- active_order(givens): Returns the editable cells of a puzzle in reading order.
+- next_active(order, index): Returns the next editable cell, wrapping around.
+- prev_active(order, index): Returns the previous editable cell, wrapping around.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from math import isqrt
+
+SIZES = (4, 9, 16, 25)  # Supported board sides, with 2x2 to 5x5 boxes
+
+Tables = namedtuple("Tables", [
+    "size", "box", "cells", "row_of", "col_of", "box_of",
+    "row_units", "col_units", "box_units", "units", "units_of", "peers",
+])
+
+
+@lru_cache(maxsize=None)
+def get_tables(size=9):
+    """
+    Returns the index tables of a board size, building them on first use.
+
+    Parameters:
+    - size (int): The side of the board, one of SIZES.
+
+    Returns:
+    - Tables: The size, box side and cell count, and the tables listed above.
+    """
+    if size not in SIZES:
+        raise ValueError(f"Unsupported board size {size}, expected one of {SIZES}")
+    box = isqrt(size)
+    cells = size * size
+    row_of = tuple(index // size for index in range(cells))
+    col_of = tuple(index % size for index in range(cells))
+    box_of = tuple(box * (index // (size * box)) + (index % size) // box for index in range(cells))
+
+    row_units = tuple(tuple(row * size + col for col in range(size)) for row in range(size))
+    col_units = tuple(tuple(row * size + col for row in range(size)) for col in range(size))
+    box_units = tuple(
+        tuple((box * (b // box) + row) * size + box * (b % box) + col for row in range(box) for col in range(box))
+        for b in range(size)
+    )
+    units = row_units + col_units + box_units
+
+    units_of = tuple((row_units[row_of[index]], col_units[col_of[index]], box_units[box_of[index]])
+                     for index in range(cells))
+    peers = tuple(
+        tuple(sorted(set(units_of[index][0] + units_of[index][1] + units_of[index][2]) - {index}))
+        for index in range(cells)
+    )
+    return Tables(size, box, cells, row_of, col_of, box_of,
+                  row_units, col_units, box_units, units, units_of, peers)
+
+
+_STANDARD = get_tables(9)
+ROW_OF = _STANDARD.row_of
+COL_OF = _STANDARD.col_of
+BOX_OF = _STANDARD.box_of
+ROW_UNITS = _STANDARD.row_units
+COL_UNITS = _STANDARD.col_units
+BOX_UNITS = _STANDARD.box_units
+UNITS = _STANDARD.units
+UNITS_OF = _STANDARD.units_of
+PEERS = _STANDARD.peers
+
+
+def active_order(givens):
+    """
+    Returns the editable cells of a puzzle in reading order.
+
+    Parameters:
+    - givens (bytes): 1 for each fixed cell, 0 for each editable cell.
+
+    Returns:
+    - list: The flat indices of the editable cells, sorted.
+    """
+    return [index for index in range(len(givens)) if not givens[index]]
+
+
+def next_active(order, index):
+    """
+    Returns the editable cell after a position, wrapping around to the start.
+
+    Parameters:
+    - order (list): The sorted flat indices of the editable cells.
+    - index (int): The current flat index, -1 to start from the beginning.
+
+    Returns:
+    - int: The flat index of the next editable cell, or None if there is none.
+    """
+    if not order:
+        return None
+    position = bisect_right(order, index)
+    return order[position] if position < len(order) else order[0]
+
+
+def prev_active(order, index):
+    """
+    Returns the editable cell before a position, wrapping around to the end.
+
+    Parameters:
+    - order (list): The sorted flat indices of the editable cells.
+    - index (int): The current flat index.
+
+    Returns:
+    - int: The flat index of the previous editable cell, or None if there is none.
+    """
+    if not order:
+        return None
+    return order[bisect_left(order, index) - 1]
@@ -5,32 +5,41 @@ This file contains utility functions for the Sudoku game, including drawing the
 drawing cells, and focusing on the next or previous active cell.
 
 Functions:
-- draw_grid(window): Draws the Sudoku grid.
+- draw_grid(window, size): Draws the Sudoku grid.
 - draw_cells(window, grid): Draws the cells of the Sudoku grid.
+- draw_cell(surface, cell): Draws a single cell.
+- get_glyphs(color, font_size, notes, size): Returns the pre-rendered digits for a text color.
+- clear_glyph_cache(): Drops the pre-rendered digits, e.g. after a theme change.
 - focus_next_active_cell(grid, current_row, current_col): Finds the next active cell.
 - focus_prev_active_cell(grid, current_row, current_col): Finds the previous active cell.
 - is_grid_complete(grid, solution): Checks if the grid is complete and correct.
 """
 
 import pygame
+from math import isqrt
+from cell import (BLACK, CELL_SIZES, FONT_SIZES, LIGHT_YELLOW, NOTE_COLOR, NOTE_FONT_SIZES, SKY_BLUE,
+                  digit_symbol)
 
 
-def draw_grid(window):
+def draw_grid(window, size=9):
     """
     Draws the Sudoku grid.
 
     Parameters:
     - window (Surface): The Pygame surface to draw on.
+    - size (int): The side of the board.
     """
-    CELL_SIZE = 50
+    CELL_SIZE = CELL_SIZES[size]
     BOLD_LINE_WIDTH = 5
     THIN_LINE_WIDTH = 2
     BLACK = (0, 0, 0)
+    box = isqrt(size)
+    length = size * CELL_SIZE
 
-    for row in range(10):
-        line_width = BOLD_LINE_WIDTH if row % 3 == 0 else THIN_LINE_WIDTH
-        pygame.draw.line(window, BLACK, (0, row * CELL_SIZE), (450, row * CELL_SIZE), line_width)
-        pygame.draw.line(window, BLACK, (row * CELL_SIZE, 0), (row * CELL_SIZE, 450), line_width)
+    for row in range(size + 1):
+        line_width = BOLD_LINE_WIDTH if row % box == 0 else THIN_LINE_WIDTH
+        pygame.draw.line(window, BLACK, (0, row * CELL_SIZE), (length, row * CELL_SIZE), line_width)
+        pygame.draw.line(window, BLACK, (row * CELL_SIZE, 0), (row * CELL_SIZE, length), line_width)
 
 
 def draw_cells(window, grid):
@@ -40,62 +49,133 @@ def draw_cells(window, grid):
     Parameters:
     - window (Surface): The Pygame surface to draw on.
     - grid (list): The Sudoku grid.
+
+    Returns:
+    - int: The number of blits made.
     """
-    for row in range(9):
-        for col in range(9):
-            grid[row][col].draw(window)
+    blits = 0
+    for row in grid:
+        for cell in row:
+            blits += draw_cell(window, cell)
+    return blits
+
+
+def draw_cell(surface, cell):
+    """
+    Draws a cell on the given surface, blitting its digit or notes from the glyph cache.
+
+    Parameters:
+    - surface (Surface): The Pygame surface to draw on.
+    - cell (Cell): The cell to draw.
+
+    Returns:
+    - int: The number of blits made.
+    """
+    size = cell.board.size
+    cell_size = CELL_SIZES[size]
+    x = cell.col * cell_size
+    y = cell.row * cell_size
+    if cell.selected:
+        selected_color = LIGHT_YELLOW if cell.board.notes_mode else SKY_BLUE
+        pygame.draw.rect(surface, selected_color, (x, y, cell_size, cell_size))
+    else:
+        pygame.draw.rect(surface, cell.color, (x, y, cell_size, cell_size))
+    number = cell.number
+    if number != 0:
+        text, (dx, dy) = get_glyphs(BLACK, FONT_SIZES[size], size=size)[number]
+        surface.blit(text, (x + dx, y + dy))
+        return 1
+    blits = 0
+    notes = cell.board.notes[cell.index]
+    if notes:
+        glyphs = get_glyphs(NOTE_COLOR, NOTE_FONT_SIZES[size], notes=True, size=size)
+        for digit in range(1, size + 1):
+            if notes & (1 << (digit - 1)):
+                text, (dx, dy) = glyphs[digit]
+                surface.blit(text, (x + dx, y + dy))
+                blits += 1
+    return blits
+
+
+# Pre-rendered digits keyed by (font size, text color, notes layout, board size)
+_glyph_cache = {}
+_fonts = {}
+
+
+def get_glyphs(color=BLACK, font_size=FONT_SIZES[9], notes=False, size=9):
+    """
+    Returns the pre-rendered digits of a board size for a text color, rendering
+    them on first use.
+
+    Parameters:
+    - color (tuple): The text color.
+    - font_size (int): The font size.
+    - notes (bool): Whether to lay the digits out as pencil marks, each centered in
+      its own part of the cell (a third of it on a 9x9 board), instead of centered
+      in the cell.
+    - size (int): The side of the board, which sets the digits and the cell size.
+
+    Returns:
+    - list: For each digit (index 0 is unused), the rendered surface and its offset
+      from the top-left corner of a cell.
+    """
+    key = (font_size, color, notes, size)
+    glyphs = _glyph_cache.get(key)
+    if glyphs is None:
+        font = _fonts.get(font_size)
+        if font is None:
+            font = _fonts[font_size] = pygame.font.SysFont(None, font_size)
+        cell_size = CELL_SIZES[size]
+        box = isqrt(size)
+        glyphs = [None]
+        for digit in range(1, size + 1):
+            text = font.render(digit_symbol(digit), True, color)
+            if notes:
+                part = cell_size / box
+                center = (int(part * ((digit - 1) % box) + part / 2), int(part * ((digit - 1) // box) + part / 2))
+            else:
+                center = (cell_size // 2, cell_size // 2)
+            glyphs.append((text, text.get_rect(center=center).topleft))
+        _glyph_cache[key] = glyphs
+    return glyphs
+
+
+def clear_glyph_cache():
+    """
+    Drops the pre-rendered digits and fonts so they are rebuilt on next use.
+    """
+    _glyph_cache.clear()
+    _fonts.clear()
 
 
 def focus_next_active_cell(grid, current_row, current_col):
     """
-    Finds the next active cell in the grid.
+    Finds the next active cell in the grid, wrapping around to the start.
 
     Parameters:
-    - grid (list): The Sudoku grid.
+    - grid (Board): The Sudoku grid.
     - current_row (int): The current row index.
     - current_col (int): The current column index.
 
     Returns:
     - tuple: The row and column of the next active cell.
     """
-    for row in range(current_row, 9):
-        for col in range(current_col + 1, 9):
-            if grid[row][col].active:
-                return row, col
-        current_col = -1  # Reset column index after finishing the current row
-
-    for row in range(current_row + 1):
-        for col in range(9):
-            if grid[row][col].active:
-                return row, col
-
-    return None, None
+    return grid.next_active_cell(current_row, current_col)
 
 
 def focus_prev_active_cell(grid, current_row, current_col):
     """
-    Finds the previous active cell in the grid.
+    Finds the previous active cell in the grid, wrapping around to the end.
 
     Parameters:
-    - grid (list): The Sudoku grid.
+    - grid (Board): The Sudoku grid.
     - current_row (int): The current row index.
     - current_col (int): The current column index.
 
     Returns:
     - tuple: The row and column of the previous active cell.
     """
-    for row in range(current_row, -1, -1):
-        for col in range(current_col - 1, -1, -1):
-            if grid[row][col].active:
-                return row, col
-        current_col = 9  # Reset column index after finishing the current row
-
-    for row in range(8, current_row, -1):
-        for col in range(8, -1, -1):
-            if grid[row][col].active:
-                return row, col
-
-    return None, None
+    return grid.prev_active_cell(current_row, current_col)
 
 
 def is_grid_complete(grid, solution):
@@ -103,14 +183,11 @@ def is_grid_complete(grid, solution):
     Checks if the grid is complete and correct.
 
     Parameters:
-    - grid (list): The Sudoku grid.
-    - solution (list): The solution to the Sudoku puzzle.
+    - grid (Board): The Sudoku grid.
+    - solution (list): The solution to the Sudoku puzzle. The board keeps its own
+      count of correct cells, so this is not needed for the check.
 
     Returns:
     - bool: True if the grid is complete and correct, False otherwise.
     """
-    for row in range(9):
-        for col in range(9):
-            if grid[row][col].number != solution[row][col]:
-                return False
-    return True
+    return grid.is_complete()